@@ -1,5 +1,11 @@
+import numpy as np
 import pandas as pd
 
+# Mapeo int8 -> señal como gather sobre un array: el índice -1 (SELL) envuelve
+# al último elemento, sin diccionario ni condicionales por barra.
+_SIGNAL_STRS = np.array(['HOLD', 'BUY', 'SELL'])
+
+
 class BasicStrategy:
     """
     Una estrategia de trading básica que genera señales de COMPRA/VENTA/MANTENER.
@@ -15,8 +21,35 @@ class BasicStrategy:
         """
         self.rsi_oversold = rsi_oversold
         self.rsi_overbought = rsi_overbought
+        # Vector de señales precalculado para modo backtest (ver precompute)
+        self._signals = None
         print(f"Estrategia Básica inicializada con RSI Oversold < {rsi_oversold} y Overbought > {rsi_overbought}")
 
+    def precompute(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Precalcula el vector de señales de TODO el histórico en un solo pase
+        NumPy (1=BUY, -1=SELL, 0=HOLD).
+
+        En un backtest, check_signal se invoca una vez por barra; construir
+        las Series de iloc[-1]/iloc[-2] en cada llamada domina el coste. Con
+        el vector precalculado, cada llamada se reduce a indexar un int8.
+        """
+        rsi = df['RSI_14'].to_numpy()
+        mh = df['MACDh_12_26_9'].to_numpy()
+
+        signals = np.zeros(len(df), dtype=np.int8)
+        buy = (rsi[1:] < self.rsi_oversold) & (mh[1:] > 0) & (mh[:-1] < 0)
+        sell = (rsi[1:] > self.rsi_overbought) & (mh[1:] < 0) & (mh[:-1] > 0)
+        signals[1:][buy] = 1
+        signals[1:][sell] = -1
+
+        self._signals = signals
+        return signals
+
+    # Alias de la interfaz SignalStrategy del paquete principal (el archivo
+    # se mantiene autocontenido, sin importar signal_generators).
+    precompute_signals = precompute
+
     def check_signal(self, df: pd.DataFrame) -> str:
         """
         Analiza el DataFrame con indicadores y devuelve una señal de trading.
@@ -32,6 +65,11 @@ class BasicStrategy:
         if len(df) < 2:
             return 'HOLD'
 
+        # Camino rápido: si el histórico ya fue precalculado, la señal de la
+        # barra actual es una lectura directa del vector.
+        if self._signals is not None and len(df) <= self._signals.size:
+            return _SIGNAL_STRS[self._signals[len(df) - 1]]
+
         # Obtenemos la última vela (la más reciente, que acaba de cerrar) y la penúltima.
         latest_candle = df.iloc[-1]
         previous_candle = df.iloc[-2]
@@ -1,6 +1,47 @@
 # Contenido completo del archivo
+import numpy as np
 import pandas as pd
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        # Decorador neutro: sin numba el bucle corre como Python puro.
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrapper(func):
+            return func
+        return wrapper
+
+
+@njit(cache=True)
+def _breakout_loop(close, upper_prev, lower_prev, direction):
+    """
+    Señales de breakout sobre todo el histórico en un solo pase compilado.
+
+    direction es el vector de estados REALES de dirección por barra
+    (int8: 1=LONG, -1=SHORT, 0=FLAT), el mismo estado que check_signal
+    recibe del caller — incluye las vueltas a FLAT tras salidas por SL/TP,
+    que un estado interno puramente dirigido por señales no puede conocer.
+    Devuelve int8: 1=BUY, -1=SELL, 0=HOLD, idéntico barra a barra al
+    camino escalar.
+    """
+    n = close.shape[0]
+    out = np.zeros(n, np.int8)
+    for i in range(n):
+        if np.isnan(upper_prev[i]) or np.isnan(lower_prev[i]):
+            continue
+        if direction[i] != 1 and close[i] > upper_prev[i]:
+            out[i] = 1
+        elif direction[i] != -1 and close[i] < lower_prev[i]:
+            out[i] = -1
+    return out
+
+
 class BreakoutStrategy:
     """
     Estrategia de breakout que genera señales en ambas direcciones (LONG y SHORT).
@@ -10,6 +51,33 @@ class BreakoutStrategy:
         self.upper_channel_col = f"DCU_{period}_{period}"
         self.lower_channel_col = f"DCL_{period}_{period}"
         print(f"Estrategia de Breakout (Bi-direccional) inicializada con periodo de {period} velas.")
+        # Vector de señales precalculado para modo backtest (ver precompute_all)
+        self._signals = None
+
+    def precompute_all(self, df: pd.DataFrame, direction_states: np.ndarray) -> np.ndarray:
+        """
+        Precalcula el vector de señales de TODO el histórico en un solo pase
+        con el bucle compilado (1=BUY, -1=SELL, 0=HOLD).
+
+        direction_states es el vector de estados reales de dirección por
+        barra (int8: 1=LONG, -1=SHORT, 0=FLAT), p. ej. reconstruido en un
+        replay offline. Con esos estados la señal replica exactamente a
+        check_signal; no puede derivarse solo de las señales porque las
+        salidas por SL/TP devuelven la posición a FLAT sin señal de por
+        medio. Por eso esta estrategia NO expone precompute_signals: el
+        Backtester no conoce los estados antes de simular.
+
+        El canal se desplaza una barra (shift) para comparar el cierre actual
+        contra el canal de la vela anterior, igual que hace check_signal con
+        iloc[-2].
+        """
+        close = df['Close'].to_numpy(dtype=np.float64)
+        upper_prev = df[self.upper_channel_col].shift(1).to_numpy(dtype=np.float64)
+        lower_prev = df[self.lower_channel_col].shift(1).to_numpy(dtype=np.float64)
+        direction = np.ascontiguousarray(direction_states, dtype=np.int8)
+
+        self._signals = _breakout_loop(close, upper_prev, lower_prev, direction)
+        return self._signals
 
     def check_signal(self, df: pd.DataFrame, current_direction: str) -> str:
         """
@@ -18,19 +86,21 @@ class BreakoutStrategy:
         """
         if len(df) < self.period + 1:
             return 'HOLD'
-        
-        latest_candle = df.iloc[-1]
-        previous_candle = df.iloc[-2]
 
-        upper_channel = previous_candle[self.upper_channel_col]
-        lower_channel = previous_candle[self.lower_channel_col]
-        
+        # Las dos últimas filas de las tres columnas relevantes como un
+        # pequeño ndarray (2,3): evita construir las dos Series de iloc[-1]
+        # e iloc[-2] y sus lookups por etiqueta en cada barra.
+        arr = df.iloc[-2:][['Close', self.upper_channel_col, self.lower_channel_col]].to_numpy()
+        latest_close = arr[1, 0]
+        upper_channel = arr[0, 1]
+        lower_channel = arr[0, 2]
+
         # Si no estamos en largo y el precio rompe hacia arriba -> señal de compra.
-        if current_direction != 'LONG' and latest_candle['Close'] > upper_channel:
+        if current_direction != 'LONG' and latest_close > upper_channel:
             return 'BUY'
-        
+
         # Si no estamos en corto y el precio rompe hacia abajo -> señal de venta.
-        if current_direction != 'SHORT' and latest_candle['Close'] < lower_channel:
+        if current_direction != 'SHORT' and latest_close < lower_channel:
             return 'SELL'
 
         return 'HOLD'
\ No newline at end of file
@@ -1,5 +1,7 @@
 # Contenido completo del archivo
 
+import sys
+
 import pandas as pd
 
 class MeanReversionStrategy:
@@ -20,31 +22,67 @@ class MeanReversionStrategy:
         std_str = str(int(bb_std)) if float(bb_std).is_integer() else str(bb_std)
 
         # Nombres de las columnas que esperamos de pandas-ta, ahora centralizados.
-        self.upper_band_col = f"BBU_{bb_period}_{std_str}"
-        self.middle_band_col = f"BBM_{bb_period}_{std_str}" # <-- AÑADIDO
-        self.lower_band_col = f"BBL_{bb_period}_{std_str}"
-        self.rsi_col = f"RSI_{rsi_period}"
+        # sys.intern garantiza una única instancia de cada nombre, de modo
+        # que las comparaciones repetidas contra las columnas del DataFrame
+        # se resuelven por identidad de puntero antes de comparar caracteres.
+        self.upper_band_col = sys.intern(f"BBU_{bb_period}_{std_str}")
+        self.middle_band_col = sys.intern(f"BBM_{bb_period}_{std_str}") # <-- AÑADIDO
+        self.lower_band_col = sys.intern(f"BBL_{bb_period}_{std_str}")
+        self.rsi_col = sys.intern(f"RSI_{rsi_period}")
+
+        # Conjunto inmutable de columnas requeridas para validar el
+        # DataFrame una sola vez antes del bucle del backtest.
+        self.expected_columns = frozenset(
+            ('Close', self.lower_band_col, self.upper_band_col, self.rsi_col)
+        )
+
+        # Posiciones enteras de las columnas del camino caliente, resueltas
+        # una sola vez con get_loc en la primera llamada a check_signal.
+        # Leer df.iat[-1, pos] evita construir la Serie de df.iloc[-1]
+        # (inferencia de dtype + copia de índice) y el motor de etiquetas
+        # en cada barra.
+        self._col_names = ('Close', self.lower_band_col, self.upper_band_col, self.rsi_col)
+        self._col_idx = None
+        self._cols_id = None
 
         print(f"Estrategia de Reversión a la Media inicializada.")
         print(f"Buscando columnas de Bollinger: {self.lower_band_col}, {self.middle_band_col}, {self.upper_band_col}")
 
+    def validate(self, df: pd.DataFrame) -> None:
+        """
+        Comprueba una sola vez, antes del bucle, que el DataFrame contiene
+        todas las columnas que la estrategia necesita. check_signal asume
+        que esta validación ya se hizo y no repite la comprobación por barra.
+        """
+        missing = self.expected_columns.difference(df.columns)
+        if missing:
+            raise KeyError(f"Faltan columnas requeridas para la estrategia: {sorted(missing)}")
+
     def check_signal(self, df: pd.DataFrame) -> str:
-        # (El resto de esta función no cambia)
         if len(df) < self.bb_period or len(df) < self.rsi_period:
             return 'HOLD'
-        
-        latest_candle = df.iloc[-1]
 
-        price_at_lower_band = latest_candle['Close'] <= latest_candle[self.lower_band_col]
-        rsi_is_oversold = latest_candle[self.rsi_col] < self.rsi_oversold
-        
-        if price_at_lower_band and rsi_is_oversold:
-            return 'BUY'
+        # Cache de posiciones invalidada si cambia el objeto de columnas
+        # (reordenación o DataFrame distinto).
+        columns = df.columns
+        if self._col_idx is None or self._cols_id != id(columns):
+            self._col_idx = tuple(columns.get_loc(name) for name in self._col_names)
+            self._cols_id = id(columns)
+
+        # Cuatro lecturas escalares con iat sobre las posiciones cacheadas.
+        # Nada de df.values: con cualquier columna no numérica presente
+        # (p. ej. SYMBOL) eso apilaba el frame entero en un array de objetos
+        # O(n·m) en cada barra.
+        idx = self._col_idx
+        close = df.iat[-1, idx[0]]
+        lower_band = df.iat[-1, idx[1]]
+        upper_band = df.iat[-1, idx[2]]
+        rsi = df.iat[-1, idx[3]]
 
-        price_at_upper_band = latest_candle['Close'] >= latest_candle[self.upper_band_col]
-        rsi_is_overbought = latest_candle[self.rsi_col] > self.rsi_overbought
+        if close <= lower_band and rsi < self.rsi_oversold:
+            return 'BUY'
 
-        if price_at_upper_band and rsi_is_overbought:
+        if close >= upper_band and rsi > self.rsi_overbought:
             return 'SELL'
 
-        return 'HOLD'
\ No newline at end of file
+        return 'HOLD'
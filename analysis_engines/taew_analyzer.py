@@ -7,6 +7,8 @@ de Ondas de Elliott, proporcionando una interfaz consistente para nuestro sistem
 de trading algorítmico.
 """
 
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Optional, Union
@@ -19,6 +21,13 @@ except ImportError:
     print("ADVERTENCIA: taew no está instalado. Ejecute: pip install taew")
 
 
+# Acciones y señales indexadas por id (0=HOLD, 1=lado LONG, 2=lado SHORT):
+# convertir un id a string es indexar una tupla, sin hash ni dict en el
+# camino caliente por barra.
+WAVE_ACTIONS = ('HOLD', 'CONSIDER_LONG', 'CONSIDER_SHORT')
+TRADING_SIGNALS = ('HOLD', 'BUY', 'SELL')
+
+
 class TaewAnalyzer:
     """
     Wrapper para la librería taew que estandariza el análisis de Ondas de Elliott.
@@ -44,6 +53,12 @@ class TaewAnalyzer:
         # Cache para almacenar resultados previos y evitar recálculos innecesarios
         self.last_processed_length = 0
         self.cached_waves = []
+
+        # Cache LRU acotada de análisis completos, clave (longitud, último
+        # precio). Capacidad fija: más grande -> mayor hit ratio; más
+        # pequeña -> menos memoria en walk-forwards multi-símbolo largos.
+        self._wave_cache = OrderedDict()
+        self._wave_cache_max = 256
         
         print(f"TaewAnalyzer inicializado:")
         print(f"  - Longitud mínima de onda: {min_wave_length}")
@@ -62,11 +77,17 @@ class TaewAnalyzer:
         """
         if df.empty or len(df) < self.min_wave_length:
             return []
-        
-        # Optimización: solo procesar nuevos datos si el DataFrame ha crecido
-        if len(df) == self.last_processed_length:
-            return self.cached_waves
-        
+
+        # Optimización: cache LRU por (longitud, último precio, timestamp de
+        # la última barra). Longitud + precio solos daban falsos hits entre
+        # ventanas distintas cuando el precio revisita un nivel exacto con el
+        # mismo lookback; el timestamp identifica la ventana de forma única.
+        cache_key = (len(df), float(df[price_column].values[-1]), df.index[-1])
+        cached = self._wave_cache.get(cache_key)
+        if cached is not None:
+            self._wave_cache.move_to_end(cache_key)
+            return cached
+
         try:
             # Extraer la serie de precios como array numpy
             prices = df[price_column].values.astype(np.float64)
@@ -90,16 +111,74 @@ class TaewAnalyzer:
             # Filtrar ondas por longitud mínima
             filtered_waves = [w for w in detected_waves if len(w['x']) >= 5]  # Ondas completas 12345
             
-            # Actualizar cache
+            # Actualizar cache (evicción LRU al superar la capacidad)
             self.last_processed_length = len(df)
             self.cached_waves = filtered_waves
-            
+            self._wave_cache[cache_key] = filtered_waves
+            if len(self._wave_cache) > self._wave_cache_max:
+                self._wave_cache.popitem(last=False)
+
             return filtered_waves
             
         except Exception as e:
             print(f"Error en análisis de ondas de Elliott: {e}")
             return []
 
+    def reset_cache(self) -> None:
+        """Vacía las caches de ondas (cambio de símbolo o reinicio)."""
+        self.last_processed_length = 0
+        self.cached_waves = []
+        self._wave_cache.clear()
+
+    def extend_elliott_waves(self, prev_waves: List[Dict], prev_price: float,
+                             new_price: float) -> Optional[List[Dict]]:
+        """
+        Intenta extender un análisis previo con UNA barra nueva sin re-analizar.
+
+        En modo streaming, ventanas consecutivas comparten todas las filas
+        menos una: si la barra nueva prolonga el último tramo de la onda más
+        reciente (sigue subiendo en un tramo alcista, o bajando en uno
+        bajista), no crea ningún pivote nuevo y el etiquetado previo sigue
+        siendo válido. En ese caso se devuelve prev_waves tal cual, en O(1).
+
+        Returns:
+            prev_waves si el etiquetado previo sigue vigente, o None si la
+            barra nueva puede haber creado un pivote y hace falta re-analizar.
+        """
+        if not prev_waves:
+            return None
+
+        latest_wave = max(prev_waves, key=lambda w: max(w.get('z', [0])))
+        x_points = latest_wave.get('x') or []
+        if len(x_points) < 2:
+            return None
+
+        rising = x_points[-1] >= x_points[-2]
+        if (rising and new_price >= prev_price) or \
+                (not rising and new_price <= prev_price):
+            return prev_waves
+        return None
+
+    def analyze_elliott_waves_incremental(self, df: pd.DataFrame,
+                                          price_column: str = 'Close',
+                                          warm_start: Optional[List[Dict]] = None,
+                                          prev_price: Optional[float] = None) -> List[Dict]:
+        """
+        Análisis con warm-start desde el etiquetado de la llamada anterior.
+
+        Si warm_start (las ondas previas) sigue vigente porque la barra nueva
+        prolonga el último tramo (ver extend_elliott_waves), se devuelve en
+        O(1); en cualquier otro caso cae al análisis completo. taew no expone
+        reanudación desde un pivote confirmado, así que el prefijo compartido
+        solo se ahorra cuando la barra nueva no puede crear pivotes.
+        """
+        if warm_start is not None and prev_price is not None:
+            new_price = float(df[price_column].values[-1])
+            reused = self.extend_elliott_waves(warm_start, prev_price, new_price)
+            if reused is not None:
+                return reused
+        return self.analyze_elliott_waves(df, price_column=price_column)
+
     def _detect_upward_waves(self, prices: np.ndarray) -> List[Dict]:
         """Detecta ondas impulsivas alcistas usando taew."""
         try:
@@ -200,37 +279,43 @@ class TaewAnalyzer:
                             reverse=True)
         
         latest_wave = sorted_waves[0]
-        
-        # Determinar el tipo de señal basado en la onda más reciente
+
+        # Determinar el tipo de señal basado en la onda más reciente.
+        # suggested_action_id permite a los consumidores convertir a señal
+        # indexando WAVE_ACTIONS/TRADING_SIGNALS sin pasar por diccionarios.
+        action_id = self._determine_trading_action_id(latest_wave)
         signal_info = {
             'wave_direction': latest_wave['direction'],
             'wave_type': latest_wave['type'],
             'wave_points': len(latest_wave.get('x', [])),
             'confidence': latest_wave.get('confidence', 0.0),
-            'suggested_action': self._determine_trading_action(latest_wave),
+            'suggested_action': WAVE_ACTIONS[action_id],
+            'suggested_action_id': action_id,
             'wave_data': latest_wave
         }
-        
+
         return signal_info
 
-    def _determine_trading_action(self, wave: Dict) -> str:
+    def _determine_trading_action_id(self, wave: Dict) -> int:
         """
-        Determina la acción de trading sugerida basada en la onda detectada.
-        
-        Esta es una lógica básica que se puede refinar posteriormente.
+        Determina la acción de trading sugerida como id de WAVE_ACTIONS.
         """
         direction = wave.get('direction', '')
         wave_count = len(wave.get('x', []))
-        
+
         # Lógica básica: buscar finales de ondas correctivas para entradas
         if direction == 'DOWNWARD' and wave_count >= 5:
             # Final de onda correctiva bajista -> posible entrada LONG
-            return 'CONSIDER_LONG'
+            return 1
         elif direction == 'UPWARD' and wave_count >= 5:
             # Final de onda impulsiva alcista -> posible salida LONG o entrada SHORT
-            return 'CONSIDER_SHORT'
+            return 2
         else:
-            return 'HOLD'
+            return 0
+
+    def _determine_trading_action(self, wave: Dict) -> str:
+        """Versión string de _determine_trading_action_id (compatibilidad)."""
+        return WAVE_ACTIONS[self._determine_trading_action_id(wave)]
 
     def print_wave_summary(self, detected_waves: List[Dict]) -> None:
         """Imprime un resumen legible de las ondas detectadas."""
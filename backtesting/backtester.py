@@ -34,21 +34,61 @@ class Backtester:
         
         print(f"Simulando {len(master_index)} pasos de tiempo...")
 
+        # Precomputación vectorizada de señales (interfaz SignalStrategy):
+        # si la estrategia puede calcular todo su vector de una pasada, se
+        # hace UNA vez aquí y cada check_signal del bucle se reduce a una
+        # lectura int8. Solo aplica con un único activo: el vector
+        # precalculado es por-estrategia y se pisaría entre símbolos.
+        strategy = getattr(self.portfolio_manager, 'strategy', None)
+        if strategy is not None and len(historical_data) == 1:
+            symbol, df = next(iter(historical_data.items()))
+
+            # Precálculo ligero por serie (p. ej. el gate de tendencia):
+            # solo necesita los precios crudos, no los indicadores.
+            if hasattr(strategy, 'prepare'):
+                strategy.prepare(df)
+
+            if hasattr(strategy, 'precompute_signals'):
+                try:
+                    full_df = self.portfolio_manager.indicator_manager.calculate_indicators(df.copy())
+                    strategy.precompute_signals(full_df)
+                    print(f"✅ Señales de {symbol} precalculadas en modo vectorizado.")
+                except Exception as e:
+                    print(f"⚠️  Precomputación de señales no disponible ({e}); modo escalar.")
+
+        multi_asset = len(historical_data) > 1
+
         # 2. Iterar a través del tiempo, no de los activos.
         for i in tqdm(range(min_data_points, len(master_index)), desc="Simulando Portfolio"):
             current_timestamp = master_index[i]
 
-            # 3. En cada paso de tiempo, iterar sobre los activos.
-            for symbol, df in historical_data.items():
-                # Si hay datos para este activo en este momento...
-                if current_timestamp in df.index:
-                    # Creamos una vista de los datos hasta el momento actual
-                    data_slice = df.loc[:current_timestamp]
-                    
-                    # Pedimos al PortfolioManager que se actualice para este símbolo
-                    self.portfolio_manager.update_for_symbol(data_slice.copy(), symbol)
+            if multi_asset:
+                # 3a. Multi-activo: recolectar los slices con dato en este
+                # paso y despachar el lote completo — update_batch evalúa el
+                # SL/TP de todas las posiciones abiertas en una sola pasada
+                # NumPy en lugar de iterar símbolo a símbolo.
+                df_slices = {
+                    symbol: df.loc[:current_timestamp].copy()
+                    for symbol, df in historical_data.items()
+                    if current_timestamp in df.index
+                }
+                if df_slices:
+                    self.portfolio_manager.update_batch(df_slices)
+            else:
+                # 3b. Un solo activo: camino directo por símbolo.
+                for symbol, df in historical_data.items():
+                    # Si hay datos para este activo en este momento...
+                    if current_timestamp in df.index:
+                        # Creamos una vista de los datos hasta el momento actual
+                        data_slice = df.loc[:current_timestamp]
+
+                        # Pedimos al PortfolioManager que se actualice para este símbolo
+                        self.portfolio_manager.update_for_symbol(data_slice.copy(), symbol)
 
         print("Simulación de portfolio completada.")
+
+        # Volcar los eventos acumulados durante la simulación (modo verbose)
+        self.portfolio_manager.flush_event_log()
         
         self.analyzer.analyze(
             trade_history=self.portfolio_manager.trade_history,
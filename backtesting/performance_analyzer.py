@@ -1,5 +1,6 @@
 # Contenido completo del archivo
 
+import numpy as np
 import pandas as pd
 import quantstats as qs
 
@@ -51,9 +52,14 @@ class PerformanceAnalyzer:
         trade_df['exit_time'] = pd.to_datetime(trade_df['exit_time'])
         trade_df.sort_values(by='exit_time', inplace=True)
         
-        equity_curve = trade_df['pnl'].cumsum() + initial_capital
-        returns = equity_curve.pct_change().fillna(0)
-        returns.index = pd.to_datetime(returns.index)
+        # Calculamos los retornos directamente sobre NumPy: pct_change() + fillna()
+        # materializan varias Series intermedias (shift, diferencia, relleno) que
+        # aquí evitamos con una sola división sobre un buffer preasignado.
+        eq = (trade_df['pnl'].cumsum() + initial_capital).to_numpy()
+        r = np.empty_like(eq)
+        r[0] = 0.0
+        np.divide(eq[1:] - eq[:-1], eq[:-1], out=r[1:])
+        returns = pd.Series(r, index=pd.DatetimeIndex(trade_df['exit_time']))
 
         # --- Generar Reporte HTML con QuantStats ---
         # Usamos periods_per_year para anualizar correctamente las métricas.
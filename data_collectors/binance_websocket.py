@@ -16,12 +16,21 @@ class BinanceWebsocketClient:
     Cliente para conectarse al Websocket de Binance y gestionar los datos de las klines.
     """
     # El resto del archivo permanece exactamente igual...
-    def __init__(self, url: str, initial_df: pd.DataFrame = None, callback: Callable[[pd.DataFrame], None] = None):
+    def __init__(self, url: str, initial_df: pd.DataFrame = None, callback: Callable[[pd.DataFrame], None] = None,
+                 callback_throttle_secs: float = 0.0):
         """
         Inicializa el cliente del Websocket.
+
+        Args:
+            callback_throttle_secs: Segundos mínimos entre invocaciones del callback.
+                Con 0 (por defecto) se notifica cada vela cerrada. Para streams de
+                alta frecuencia (ej. klines de 1s) permite agrupar actualizaciones
+                y evitar copiar el DataFrame completo en cada tick.
         """
         self.url = url
         self.callback = callback
+        self.callback_throttle_secs = callback_throttle_secs
+        self._last_cb = 0.0
         self.wsapp = None
         
         if initial_df is not None and not initial_df.empty:
@@ -87,7 +96,12 @@ class BinanceWebsocketClient:
             # print(self.df.tail(1))
 
             if self.callback:
-                self.callback(self.df.copy())
+                # Throttling: para streams muy rápidos no tiene sentido copiar el
+                # DataFrame completo en cada vela; agrupamos las notificaciones.
+                now = time.time()
+                if now - self._last_cb >= self.callback_throttle_secs:
+                    self._last_cb = now
+                    self.callback(self.df.copy())
     
     def start(self):
         print("Iniciando conexión de Websocket...")
@@ -1,37 +1,80 @@
+import threading
+
+import numpy as np
 import pandas as pd
 from binance.client import Client
 # La importación de settings y KLINE_COLUMNS ahora es absoluta
 from config.settings import KLINE_COLUMNS
 # La definición de KLINE_COLUMNS se ha movido a settings.py
 
+# Cliente por hilo: Client() monta una requests.Session con handshake TLS y
+# validación de claves, y requests.Session NO es thread-safe, así que las
+# descargas concurrentes (test_multiple_assets) no pueden compartir un
+# singleton. Cada hilo reutiliza su propio cliente entre llamadas, lo que
+# conserva el keep-alive HTTP dentro del hilo sin pagar el setup por símbolo.
+_CLIENT_LOCAL = threading.local()
+
+
+def _get_client() -> Client:
+    client = getattr(_CLIENT_LOCAL, 'client', None)
+    if client is None:
+        client = Client()
+        _CLIENT_LOCAL.client = client
+    return client
+
 def get_historical_klines(symbol: str, interval: str, limit: int = 500) -> pd.DataFrame:
     # ... (El código de esta función no cambia)
     print(f"Obteniendo {limit} velas históricas para {symbol} en intervalo de {interval}...")
-    client = Client() 
+    client = _get_client()
     klines = client.get_klines(symbol=symbol.upper(), interval=interval, limit=limit)
     df = pd.DataFrame(klines, columns=KLINE_COLUMNS)
     df['Open_time'] = pd.to_datetime(df['Open_time'], unit='ms')
     df['Close_time'] = pd.to_datetime(df['Close_time'], unit='ms')
-    numeric_columns = ['Open', 'High', 'Low', 'Close', 'Volume', 'Quote_asset_volume', 
+    numeric_columns = ['Open', 'High', 'Low', 'Close', 'Volume', 'Quote_asset_volume',
                        'Taker_buy_base_asset_volume', 'Taker_buy_quote_asset_volume']
-    df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric, axis=1)
+    # Conversión vectorizada por columna: apply(..., axis=1) despachaba
+    # to_numeric fila por fila. Binance devuelve strings numéricos limpios,
+    # así que un astype masivo es suficiente.
+    df[numeric_columns] = df[numeric_columns].astype(np.float64)
     df['Number_of_trades'] = df['Number_of_trades'].astype(int)
     print(f"Se obtuvieron {len(df)} velas históricas exitosamente.")
     return df
 
-def get_extended_historical_klines(symbol: str, interval: str, start_str: str) -> pd.DataFrame:
-    # ... (El código de esta función no cambia)
-    client = Client()
+def get_extended_historical_klines(symbol: str, interval: str, start_str: str, return_polars: bool = False) -> pd.DataFrame:
+    # Con return_polars=True devuelve un polars.DataFrame para el camino de
+    # backtest masivo (requiere tener polars instalado).
+    client = _get_client()
     print(f"Obteniendo datos históricos extendidos para {symbol} desde {start_str}...")
     klines_generator = client.get_historical_klines_generator(symbol, interval, start_str)
-    df = pd.DataFrame(klines_generator, columns=KLINE_COLUMNS)
-    df['Open_time'] = pd.to_datetime(df['Open_time'], unit='ms')
-    df['Close_time'] = pd.to_datetime(df['Close_time'], unit='ms')
-    numeric_columns = ['Open', 'High', 'Low', 'Close', 'Volume', 'Quote_asset_volume', 
+
+    # Materializamos el generador en un ndarray 2D tipado una sola vez, en vez
+    # de dejar que pandas infiera tipos fila a fila sobre la lista de listas.
+    rows = list(klines_generator)
+    if not rows:
+        print(f"Sin datos históricos para {symbol} desde {start_str}.")
+        return pd.DataFrame(columns=KLINE_COLUMNS)
+
+    arr = np.asarray(rows, dtype=object)
+
+    # Dedupe + orden en UN solo pase: np.unique sobre Close_time devuelve los
+    # timestamps ordenados con el índice de su primera aparición, lo que
+    # reemplaza a drop_duplicates(keep='first') + sort_values.
+    close_times_ms = arr[:, KLINE_COLUMNS.index('Close_time')].astype(np.int64)
+    _, unique_idx = np.unique(close_times_ms, return_index=True)
+    arr = arr[unique_idx]
+
+    df = pd.DataFrame({col: arr[:, i] for i, col in enumerate(KLINE_COLUMNS)})
+    df['Open_time'] = pd.to_datetime(df['Open_time'].astype(np.int64), unit='ms')
+    df['Close_time'] = pd.to_datetime(df['Close_time'].astype(np.int64), unit='ms')
+    numeric_columns = ['Open', 'High', 'Low', 'Close', 'Volume', 'Quote_asset_volume',
                        'Taker_buy_base_asset_volume', 'Taker_buy_quote_asset_volume']
-    df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric, axis=1)
+    # Misma conversión vectorizada por columna que en get_historical_klines.
+    df[numeric_columns] = df[numeric_columns].astype(np.float64)
     df['Number_of_trades'] = df['Number_of_trades'].astype(int)
-    df.drop_duplicates(subset='Close_time', keep='first', inplace=True)
-    df.sort_values(by='Close_time', inplace=True)
     print(f"Se obtuvieron {len(df)} velas históricas desde {start_str} exitosamente.")
+
+    if return_polars:
+        import polars as pl
+        return pl.from_pandas(df)
+
     return df
\ No newline at end of file
@@ -1,137 +1,304 @@
 # indicators/indicator_manager.py
 # Versión simplificada con indicadores esenciales para ElliottWaveStrategy
 
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import talib
+    TALIB_AVAILABLE = True
+except ImportError:
+    TALIB_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        # Decorador neutro: sin numba el kernel corre como Python/NumPy puro.
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrapper(func):
+            return func
+        return wrapper
+
+
+@njit(cache=True, fastmath=True)
+def _compute_essential_indicators(high, low, close):
+    """
+    Kernel único que calcula ATR_14 (Wilder), RSI_14 (Wilder) y EMA_21
+    en UN solo recorrido de los arrays.
+
+    Antes cada indicador era una pasada independiente de pandas-ta que
+    construía sus propias Series intermedias; fusionar los bucles reduce
+    el trabajo por tick a una lectura secuencial de los datos.
+    """
+    n = close.shape[0]
+    atr = np.full(n, np.nan)
+    rsi = np.full(n, np.nan)
+    ema = np.full(n, np.nan)
+
+    atr_period = 14
+    rsi_period = 14
+    ema_period = 21
+    ema_alpha = 2.0 / (ema_period + 1.0)
+
+    tr_sum = 0.0
+    atr_prev = 0.0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    close_sum = close[0]
+    ema_prev = 0.0
+
+    for i in range(1, n):
+        # --- True Range / ATR (suavizado Wilder) ---
+        hl = high[i] - low[i]
+        hc = abs(high[i] - close[i - 1])
+        lc = abs(low[i] - close[i - 1])
+        tr = hl
+        if hc > tr:
+            tr = hc
+        if lc > tr:
+            tr = lc
+
+        if i < atr_period:
+            tr_sum += tr
+        elif i == atr_period:
+            tr_sum += tr
+            atr_prev = tr_sum / atr_period
+            atr[i] = atr_prev
+        else:
+            atr_prev = (atr_prev * (atr_period - 1) + tr) / atr_period
+            atr[i] = atr_prev
+
+        # --- RSI (ganancias/pérdidas con suavizado Wilder) ---
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if i <= rsi_period:
+            avg_gain += gain
+            avg_loss += loss
+            if i == rsi_period:
+                avg_gain /= rsi_period
+                avg_loss /= rsi_period
+                if avg_loss == 0.0:
+                    rsi[i] = 100.0
+                else:
+                    rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        else:
+            avg_gain = (avg_gain * (rsi_period - 1) + gain) / rsi_period
+            avg_loss = (avg_loss * (rsi_period - 1) + loss) / rsi_period
+            if avg_loss == 0.0:
+                rsi[i] = 100.0
+            else:
+                rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        # --- EMA_21 (semilla con SMA de las primeras 21 velas) ---
+        if i < ema_period - 1:
+            close_sum += close[i]
+        elif i == ema_period - 1:
+            close_sum += close[i]
+            ema_prev = close_sum / ema_period
+            ema[i] = ema_prev
+        else:
+            ema_prev = ema_prev + ema_alpha * (close[i] - ema_prev)
+            ema[i] = ema_prev
+
+    return atr, rsi, ema
+
 
 class IndicatorManager:
     """
     Gestor de indicadores simplificado que calcula solo los indicadores esenciales.
-    
-    Con la integración de python-taew, la librería realizará su propio análisis 
+
+    Con la integración de python-taew, la librería realizará su propio análisis
     internamente, pero mantenemos algunos indicadores básicos necesarios para
     el sistema de risk management.
     """
-    
+
     def __init__(self):
         """
         Inicializa el gestor de indicadores en modo simplificado.
         """
         print("IndicatorManager inicializado en modo simplificado (con indicadores esenciales)")
-        print("Nota: Cálculo optimizado para ElliottWaveStrategy")
+        if TALIB_AVAILABLE:
+            print("Nota: Cálculo con kernels C de TA-Lib")
+        else:
+            print(f"Nota: Cálculo vectorizado en un solo pase (numba: {'sí' if NUMBA_AVAILABLE else 'no'})")
+
+    def calculate_indicators_fast(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Camino caliente sin try/except ni rellenos de NaN.
 
-    def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+        Asume esquema OHLCV válido y len(df) >= 21; el warmup con validación,
+        fallbacks y fillna es calculate_indicators. Los NaN de cabecera de cada
+        indicador se dejan tal cual: ningún consumidor del camino por tick lee
+        esas filas iniciales.
         """
-        Calcula indicadores esenciales necesarios para el sistema.
-        
+        # Un solo pase sobre arrays float64 calcula los tres indicadores.
+        # Forzamos buffers contiguos: garantiza que el kernel (numba/TA-Lib)
+        # recorra memoria secuencial y pueda autovectorizarse (SIMD).
+        high = np.ascontiguousarray(df['High'].to_numpy(dtype=np.float64))
+        low = np.ascontiguousarray(df['Low'].to_numpy(dtype=np.float64))
+        close = np.ascontiguousarray(df['Close'].to_numpy(dtype=np.float64))
+
+        if TALIB_AVAILABLE:
+            # Kernels en C de TA-Lib: operan directamente sobre los
+            # ndarrays sin construir ninguna Series intermedia.
+            atr = talib.ATR(high, low, close, timeperiod=14)
+            rsi = talib.RSI(close, timeperiod=14)
+            ema = talib.EMA(close, timeperiod=21)
+        else:
+            atr, rsi, ema = _compute_essential_indicators(high, low, close)
+
+        df['ATR_14'] = atr
+        df['RSI_14'] = rsi
+        df['EMA_21'] = ema
+        return df
+
+    def calculate_indicators(self, df: pd.DataFrame, inplace: bool = True) -> pd.DataFrame:
+        """
+        Calcula indicadores esenciales necesarios para el sistema (warmup).
+
+        Este es el camino validado: maneja datasets pequeños, rellena NaN en
+        indicadores críticos y cae a indicadores sintéticos ante cualquier
+        error. Para el camino por tick usar calculate_indicators_fast.
+
         Args:
             df (pd.DataFrame): DataFrame con datos OHLCV
-            
+            inplace (bool): Si True (por defecto), escribe los indicadores como
+                columnas nuevas sobre el mismo DataFrame en lugar de duplicar
+                todo el histórico OHLCV en cada llamada. Usar False cuando el
+                caller necesite conservar el DataFrame original intacto.
+
         Returns:
             pd.DataFrame: DataFrame con indicadores esenciales agregados
         """
         try:
-            df_with_indicators = df.copy()
-            
-            # Renombramos a minúsculas para compatibilidad con pandas-ta
-            df_with_indicators.rename(columns={
-                "Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"
-            }, inplace=True)
-            
-            # Calcular solo indicadores esenciales para el sistema
-            
-            # 1. ATR - Esencial para risk management (stop loss)
-            if len(df_with_indicators) >= 14:
-                df_with_indicators['ATR_14'] = ta.atr(
-                    high=df_with_indicators['high'],
-                    low=df_with_indicators['low'],
-                    close=df_with_indicators['close'],
-                    length=14
-                )
+            df_with_indicators = df if inplace else df.copy()
+
+            if len(df_with_indicators) >= 21:
+                self.calculate_indicators_fast(df_with_indicators)
             else:
-                # Para datasets pequeños, usar un ATR sintético basado en volatilidad
-                price_range = df_with_indicators['high'] - df_with_indicators['low']
+                # Para datasets pequeños, usar indicadores sintéticos
+                price_range = df_with_indicators['High'] - df_with_indicators['Low']
                 df_with_indicators['ATR_14'] = price_range.rolling(window=min(len(df_with_indicators), 5)).mean()
-            
-            # 2. RSI - Útil para filtros adicionales si necesario
-            if len(df_with_indicators) >= 14:
-                df_with_indicators['RSI_14'] = ta.rsi(
-                    close=df_with_indicators['close'],
-                    length=14
-                )
-            else:
-                # RSI sintético para datasets pequeños
                 df_with_indicators['RSI_14'] = 50.0  # Valor neutral
-            
-            # 3. EMAs simples para contexto de tendencia (opcional)
-            if len(df_with_indicators) >= 21:
-                df_with_indicators['EMA_21'] = ta.ema(
-                    close=df_with_indicators['close'],
-                    length=21
-                )
-            else:
-                df_with_indicators['EMA_21'] = df_with_indicators['close']
-            
-            # Revertir los nombres a Mayúscula inicial
-            df_with_indicators.rename(columns={
-                "open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"
-            }, inplace=True)
-            
-            # Asegurar que no hay valores NaN en indicadores críticos
-            df_with_indicators['ATR_14'] = df_with_indicators['ATR_14'].fillna(
-                df_with_indicators['ATR_14'].mean()
-            )
-            df_with_indicators['RSI_14'] = df_with_indicators['RSI_14'].fillna(50.0)
-            df_with_indicators['EMA_21'] = df_with_indicators['EMA_21'].fillna(
-                df_with_indicators['Close']
-            )
-            
+                df_with_indicators['EMA_21'] = df_with_indicators['Close']
+
+            # Asegurar que no hay valores NaN en indicadores críticos.
+            # Relleno en NumPy: sembrar la cabecera del ATR con su primer valor
+            # válido es O(head) y evita la reducción .mean() sobre toda la
+            # columna que hacía el fillna anterior. copy=True: bajo
+            # Copy-on-Write to_numpy devuelve vistas de solo lectura, así que
+            # escribir sobre ellas lanzaría "assignment destination is
+            # read-only" y nos mandaría al fallback sintético.
+            atr = df_with_indicators['ATR_14'].to_numpy(dtype=np.float64, copy=True)
+            valid_mask = ~np.isnan(atr)
+            if valid_mask.any():
+                first_valid = int(np.argmax(valid_mask))
+                atr[:first_valid] = atr[first_valid]
+                df_with_indicators['ATR_14'] = atr
+
+            rsi = df_with_indicators['RSI_14'].to_numpy(dtype=np.float64)
+            df_with_indicators['RSI_14'] = np.nan_to_num(rsi, nan=50.0)
+
+            # np.where produce un array nuevo: sin escritura in-place sobre
+            # la vista de la columna.
+            ema = df_with_indicators['EMA_21'].to_numpy(dtype=np.float64)
+            nan_mask = np.isnan(ema)
+            if nan_mask.any():
+                close_vals = df_with_indicators['Close'].to_numpy(dtype=np.float64)
+                df_with_indicators['EMA_21'] = np.where(nan_mask, close_vals, ema)
+
             return df_with_indicators
-            
+
         except Exception as e:
             print(f"Error calculando indicadores esenciales: {e}")
             # Fallback: agregar indicadores sintéticos mínimos
-            df_fallback = df.copy()
-            
+            df_fallback = df if inplace else df.copy()
+
             # ATR sintético basado en rango de precios
             price_range = df_fallback['High'] - df_fallback['Low']
             df_fallback['ATR_14'] = price_range.rolling(window=min(len(df_fallback), 5)).mean().fillna(price_range.mean())
-            
+
             # Indicadores placeholder
             df_fallback['RSI_14'] = 50.0
             df_fallback['EMA_21'] = df_fallback['Close']
-            
+
             return df_fallback
-    
+
+    def calculate_confluence_indicators(self, df: pd.DataFrame, bb_period: int = 20,
+                                        bb_std: float = 2.0, dc_period: int = 20) -> pd.DataFrame:
+        """
+        Calcula Bandas de Bollinger y canales Donchian para ConfluenceStrategy
+        usando vistas de ventana deslizante de NumPy (sin rolling de pandas).
+
+        sliding_window_view crea una vista 2D sin copiar los datos; media,
+        desviación, máximo y mínimo se reducen por eje en C. Los nombres de
+        columna siguen la convención de pandas-ta que esperan las estrategias
+        (BBL/BBM/BBU_{periodo}_{std}, DCL/DCU_{periodo}_{periodo}).
+        """
+        n = len(df)
+        if n < max(bb_period, dc_period):
+            return df
+
+        close = np.ascontiguousarray(df['Close'].to_numpy(dtype=np.float64))
+        high = np.ascontiguousarray(df['High'].to_numpy(dtype=np.float64))
+        low = np.ascontiguousarray(df['Low'].to_numpy(dtype=np.float64))
+
+        std_str = str(int(bb_std)) if float(bb_std).is_integer() else str(bb_std)
+        bb_pad = np.full(bb_period - 1, np.nan)
+        dc_pad = np.full(dc_period - 1, np.nan)
+
+        windows = sliding_window_view(close, bb_period)
+        bbm = windows.mean(axis=1)
+        bb_dev = bb_std * windows.std(axis=1)
+        df[f'BBM_{bb_period}_{std_str}'] = np.concatenate([bb_pad, bbm])
+        df[f'BBU_{bb_period}_{std_str}'] = np.concatenate([bb_pad, bbm + bb_dev])
+        df[f'BBL_{bb_period}_{std_str}'] = np.concatenate([bb_pad, bbm - bb_dev])
+
+        df[f'DCU_{dc_period}_{dc_period}'] = np.concatenate(
+            [dc_pad, sliding_window_view(high, dc_period).max(axis=1)])
+        df[f'DCL_{dc_period}_{dc_period}'] = np.concatenate(
+            [dc_pad, sliding_window_view(low, dc_period).min(axis=1)])
+
+        return df
+
     def get_essential_indicators(self) -> list:
         """
         Retorna la lista de indicadores esenciales que calcula este manager.
-        
+
         Returns:
             list: Lista de nombres de indicadores
         """
         return ['ATR_14', 'RSI_14', 'EMA_21']
-    
+
     def validate_indicators(self, df: pd.DataFrame) -> bool:
         """
         Valida que todos los indicadores esenciales estén presentes.
-        
+
         Args:
             df (pd.DataFrame): DataFrame a validar
-            
+
         Returns:
             bool: True si todos los indicadores están presentes
         """
         essential_indicators = self.get_essential_indicators()
-        
+
         for indicator in essential_indicators:
             if indicator not in df.columns:
                 print(f"⚠️  Indicador faltante: {indicator}")
                 return False
-            
+
             # Verificar que no sean todos NaN
             if df[indicator].isna().all():
                 print(f"⚠️  Indicador con todos NaN: {indicator}")
                 return False
-        
-        return True
\ No newline at end of file
+
+        return True
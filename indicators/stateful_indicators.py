@@ -0,0 +1,207 @@
+# indicators/stateful_indicators.py
+"""
+Indicadores incrementales con estado.
+
+En el camino caliente del websocket, recalcular ATR/RSI/EMA sobre TODO el
+histórico en cada vela nueva es O(N) por tick. Estas clases mantienen el
+estado del suavizado (Wilder / exponencial) y actualizan cada indicador en
+O(1) ingiriendo únicamente la vela más reciente.
+
+El recálculo completo de IndicatorManager sigue siendo la referencia para el
+warmup inicial del histórico.
+"""
+
+from collections import deque
+
+import pandas as pd
+
+
+class EMAState:
+    """EMA incremental: mantiene el último valor y aplica el factor alpha."""
+
+    def __init__(self, period: int = 21):
+        self.period = period
+        self.alpha = 2.0 / (period + 1.0)
+        self.value = None
+        self._warmup_sum = 0.0
+        self._warmup_count = 0
+
+    def update(self, close: float) -> float:
+        if self.value is None:
+            # Semilla con SMA de las primeras `period` velas (misma convención
+            # que el kernel de IndicatorManager).
+            self._warmup_sum += close
+            self._warmup_count += 1
+            if self._warmup_count == self.period:
+                self.value = self._warmup_sum / self.period
+            return close if self.value is None else self.value
+
+        self.value = self.value + self.alpha * (close - self.value)
+        return self.value
+
+
+class RSIState:
+    """RSI incremental con suavizado Wilder de ganancias y pérdidas."""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.prev_close = None
+        self._warmup_count = 0
+
+    def update(self, close: float) -> float:
+        if self.prev_close is None:
+            self.prev_close = close
+            return 50.0
+
+        delta = close - self.prev_close
+        self.prev_close = close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if self._warmup_count < self.period:
+            self.avg_gain += gain
+            self.avg_loss += loss
+            self._warmup_count += 1
+            if self._warmup_count == self.period:
+                self.avg_gain /= self.period
+                self.avg_loss /= self.period
+            else:
+                return 50.0
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+
+        if self.avg_loss == 0.0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+
+
+class ATRState:
+    """ATR incremental: True Range de la vela nueva + suavizado Wilder."""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.value = None
+        self.prev_close = None
+        self._warmup_sum = 0.0
+        self._warmup_count = 0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is None:
+            self.prev_close = close
+            return high - low
+
+        tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+
+        if self.value is None:
+            self._warmup_sum += tr
+            self._warmup_count += 1
+            if self._warmup_count == self.period:
+                self.value = self._warmup_sum / self.period
+            return tr if self.value is None else self.value
+
+        self.value = (self.value * (self.period - 1) + tr) / self.period
+        return self.value
+
+
+class IndicatorStateBundle:
+    """
+    Agrupa los estados de los indicadores esenciales (ATR_14, RSI_14, EMA_21)
+    para un símbolo y lleva la cuenta de cuántas velas ha ingerido.
+    """
+
+    def __init__(self):
+        self.atr_state = ATRState(period=14)
+        self.rsi_state = RSIState(period=14)
+        self.ema_state = EMAState(period=21)
+        self.bars_seen = 0
+
+    def update(self, high: float, low: float, close: float) -> tuple:
+        """Ingiere una vela y devuelve (atr, rsi, ema) actualizados en O(1)."""
+        atr = self.atr_state.update(high, low, close)
+        rsi = self.rsi_state.update(close)
+        ema = self.ema_state.update(close)
+        self.bars_seen += 1
+        return atr, rsi, ema
+
+    def warmup(self, df: pd.DataFrame) -> tuple:
+        """
+        Ingiere todas las velas de un DataFrame histórico (una sola vez al
+        inicio) y devuelve los últimos valores (atr, rsi, ema).
+        """
+        high = df['High'].to_numpy()
+        low = df['Low'].to_numpy()
+        close = df['Close'].to_numpy()
+
+        atr = rsi = ema = None
+        for i in range(len(df)):
+            atr, rsi, ema = self.update(high[i], low[i], close[i])
+        return atr, rsi, ema
+
+
+class RollingExtrema:
+    """
+    Máximo y mínimo rodantes en O(1) amortizado con colas monótonas.
+
+    Cada barra nueva descarta por el final de la cola los valores que ya no
+    pueden ser extremos (dominados por una observación más reciente) y expira
+    por el frente los que salen de la ventana. Consultar el extremo es leer
+    el frente de la cola, sin re-escanear las últimas W barras con pandas.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._hi = deque()
+        self._lo = deque()
+        self._seq = -1
+        self._last_ts = None
+
+    def update_from_frame(self, df: pd.DataFrame) -> None:
+        """
+        Ingiere las barras nuevas de un DataFrame con índice temporal.
+
+        Caso común (una barra nueva al final): un push O(1). Si la ventana
+        no es contigua con la última vista (cambio de activo, reset, salto),
+        se reconstruye desde las últimas `window` filas.
+        """
+        ts = df.index[-1]
+        if ts == self._last_ts:
+            return
+
+        highs = df['High'].to_numpy()
+        lows = df['Low'].to_numpy()
+        if self._last_ts is not None and len(df) >= 2 \
+                and df.index[-2] == self._last_ts:
+            self._push(highs[-1], lows[-1])
+        else:
+            self._hi.clear()
+            self._lo.clear()
+            w = min(self.window, len(df))
+            for k in range(-w, 0):
+                self._push(highs[k], lows[k])
+        self._last_ts = ts
+
+    def _push(self, high: float, low: float) -> None:
+        self._seq += 1
+        hi, lo = self._hi, self._lo
+        while hi and hi[-1][1] <= high:
+            hi.pop()
+        hi.append((self._seq, high))
+        if hi[0][0] <= self._seq - self.window:
+            hi.popleft()
+        while lo and lo[-1][1] >= low:
+            lo.pop()
+        lo.append((self._seq, low))
+        if lo[0][0] <= self._seq - self.window:
+            lo.popleft()
+
+    @property
+    def high(self) -> float:
+        return self._hi[0][1]
+
+    @property
+    def low(self) -> float:
+        return self._lo[0][1]
@@ -1,10 +1,25 @@
 # portfolio/portfolio_manager.py
 # Versión actualizada compatible con ElliottWaveStrategy
 
+from collections import namedtuple
+
+import numpy as np
 import pandas as pd
 # Importaciones absolutas
 from risk_management.risk_assessor import RiskAssessor
 from risk_management.position import Position
+from indicators.stateful_indicators import IndicatorStateBundle
+
+
+# Registro tipado de un trade cerrado. Antes se usaba position.__dict__ +
+# dict.update: __dict__ devuelve el dict VIVO de la instancia (no una copia),
+# así que mutar ese dict alteraba la Position ya cerrada. La tupla es inmutable,
+# más compacta, y pd.DataFrame(trade_history) conserva los mismos nombres de
+# columna.
+TradeRecord = namedtuple('TradeRecord', [
+    'entry_time', 'entry_price', 'size', 'stop_loss', 'take_profit',
+    'direction', 'pnl', 'exit_reason', 'exit_time', 'symbol'
+])
 
 
 class PortfolioManager:
@@ -12,7 +27,7 @@ class PortfolioManager:
     Gestiona un portfolio de múltiples activos, aplicando una estrategia única a cada uno.
     Actualizado para ser compatible con ElliottWaveStrategy y estrategias anteriores.
     """
-    def __init__(self, initial_capital: float, risk_per_trade_pct: float, indicator_manager, strategy, risk_assessor, max_open_positions: int = 3, verbose: bool = True):
+    def __init__(self, initial_capital: float, risk_per_trade_pct: float, indicator_manager, strategy, risk_assessor, max_open_positions: int = 3, verbose: bool = False, incremental_indicators: bool = False):
         self.capital = initial_capital
         self.risk_per_trade_pct = risk_per_trade_pct
         self.indicator_manager = indicator_manager
@@ -20,9 +35,43 @@ class PortfolioManager:
         self.risk_assessor = risk_assessor
         self.max_open_positions = max_open_positions
         self.verbose = verbose
-        
+        # Modo incremental: actualiza los indicadores en O(1) por vela con
+        # objetos con estado, en lugar de recalcular todo el histórico.
+        self.incremental_indicators = incremental_indicators
+        self.indicator_states = {}  # {'BTCUSDT': IndicatorStateBundle(...)}
+
         self.open_positions = {} # Diccionario para las posiciones abiertas: {'BTCUSDT': Position(...)}
         self.trade_history = []
+
+        # Buffer de eventos en modo verbose: en lugar de formatear f-strings y
+        # bloquear en stdout dentro de la sección crítica, se acumulan tuplas
+        # crudas y flush_event_log() las formatea una sola vez al final.
+        self._event_log = []
+
+        # Representación SoA (structure-of-arrays) de las posiciones abiertas:
+        # arrays paralelos preasignados indexados por slot. El chequeo SL/TP
+        # por tick lee escalares de estos arrays (y permite vectorizar el scan
+        # sobre todas las posiciones) en lugar de hacer lookups de atributos
+        # sobre las instancias de Position.
+        self._pos_entry = np.zeros(max_open_positions)
+        self._pos_size = np.zeros(max_open_positions)
+        self._pos_sl = np.zeros(max_open_positions)
+        self._pos_tp = np.zeros(max_open_positions)
+        self._pos_dir = np.zeros(max_open_positions)  # +1 LONG, -1 SHORT
+        self._symbol_slot = {}  # {'BTCUSDT': slot}
+        self._free_slots = list(range(max_open_positions))
+
+        # Cache de posiciones de columna: se resuelve una vez por esquema y
+        # permite leer escalares de la vela por índice posicional en lugar de
+        # repetir lookups por etiqueta en cada señal.
+        self._col_idx = {}
+        self._col_schema = None
+
+        # Dedupe por barra cerrada: si el websocket emite varias
+        # actualizaciones dentro de la misma barra, los indicadores sobre esa
+        # barra son deterministas y se reutiliza el último resultado.
+        self._last_ind_ts = {}  # {'BTCUSDT': Timestamp de la última barra procesada}
+        self._last_ind_df = {}  # {'BTCUSDT': DataFrame con indicadores de esa barra}
         if self.verbose:
             print(f"PortfolioManager (Multi-Asset) inicializado. Máx. Posiciones: {max_open_positions}")
 
@@ -30,7 +79,27 @@ class PortfolioManager:
         """
         El método principal, ahora llamado para cada símbolo en cada paso de tiempo.
         """
-        df_with_indicators = self.indicator_manager.calculate_indicators(df_slice)
+        # Si ya procesamos esta misma barra cerrada para este símbolo,
+        # reutilizamos los indicadores calculados en vez de recomputarlos.
+        last_ts = df_slice.index[-1]
+        if self._last_ind_ts.get(symbol) == last_ts:
+            df_with_indicators = self._last_ind_df[symbol]
+        elif self.incremental_indicators:
+            df_with_indicators = self._update_indicators_incremental(df_slice, symbol)
+        else:
+            # df_slice ya es una copia propiedad de este manager (el backtester
+            # la crea por paso), así que los indicadores se escriben in-place
+            # sin duplicar el histórico otra vez. Con histórico suficiente
+            # usamos el camino rápido sin try/except ni rellenos; el camino
+            # validado queda para ventanas cortas.
+            if len(df_slice) >= 21 and hasattr(self.indicator_manager, 'calculate_indicators_fast'):
+                df_with_indicators = self.indicator_manager.calculate_indicators_fast(df_slice)
+            else:
+                df_with_indicators = self.indicator_manager.calculate_indicators(df_slice)
+
+        if df_with_indicators is not self._last_ind_df.get(symbol):
+            self._last_ind_ts[symbol] = last_ts
+            self._last_ind_df[symbol] = df_with_indicators
         
         # Gestionar la posición existente para este símbolo (si la hay)
         if symbol in self.open_positions:
@@ -41,9 +110,84 @@ class PortfolioManager:
         elif len(self.open_positions) < self.max_open_positions:
             self._check_new_entry(df_with_indicators, symbol)
 
+    def update_batch(self, df_slices: dict):
+        """
+        Actualización multi-activo para UN paso de tiempo.
+
+        El chequeo SL/TP de todas las posiciones abiertas se evalúa como una
+        sola comparación NumPy contra los arrays SoA, en lugar de iterar
+        símbolo a símbolo en Python. Las entradas nuevas (que dependen de la
+        estrategia y sus indicadores) siguen el camino por símbolo habitual.
+
+        Args:
+            df_slices: {'BTCUSDT': DataFrame histórico hasta el paso actual, ...}
+        """
+        # 1. Salidas: un solo pase vectorizado sobre las posiciones abiertas
+        closed_this_step = set()
+        open_symbols = [s for s in df_slices if s in self._symbol_slot]
+        if open_symbols:
+            slots = np.array([self._symbol_slot[s] for s in open_symbols])
+            highs = np.array([df_slices[s]['High'].iloc[-1] for s in open_symbols])
+            lows = np.array([df_slices[s]['Low'].iloc[-1] for s in open_symbols])
+
+            sl = self._pos_sl[slots]
+            tp = self._pos_tp[slots]
+            is_long = self._pos_dir[slots] > 0
+
+            hit_sl = np.where(is_long, lows <= sl, highs >= sl)
+            hit_tp = np.where(is_long, highs >= tp, lows <= tp)
+
+            for i, symbol in enumerate(open_symbols):
+                if hit_sl[i]:
+                    self._close_position(symbol, sl[i], 'STOP_LOSS', df_slices[symbol].index[-1])
+                    closed_this_step.add(symbol)
+                elif hit_tp[i]:
+                    self._close_position(symbol, tp[i], 'TAKE_PROFIT', df_slices[symbol].index[-1])
+                    closed_this_step.add(symbol)
+
+        # 2. Entradas: por símbolo, solo donde no hay posición y queda cupo.
+        # Los símbolos cerrados en el paso 1 se saltan esta barra: en el
+        # camino secuencial cierre y entrada son mutuamente excluyentes por
+        # barra (if gestionar / elif entrar), y reentrar aquí mismo
+        # adelantaría cada reentrada una vela respecto a ese camino.
+        for symbol, df_slice in df_slices.items():
+            if symbol in self.open_positions or symbol in closed_this_step:
+                continue
+            if len(self.open_positions) >= self.max_open_positions:
+                break
+            self.update_for_symbol(df_slice, symbol)
+
+    def _update_indicators_incremental(self, df_slice: pd.DataFrame, symbol: str) -> pd.DataFrame:
+        """
+        Camino caliente O(1): ingiere solo las velas nuevas en los estados del
+        símbolo y escribe los valores escalares en la última fila. El recálculo
+        completo de IndicatorManager queda reservado para el warmup inicial.
+        """
+        states = self.indicator_states.get(symbol)
+        if states is None:
+            states = IndicatorStateBundle()
+            self.indicator_states[symbol] = states
+
+        high = df_slice['High'].to_numpy()
+        low = df_slice['Low'].to_numpy()
+        close = df_slice['Close'].to_numpy()
+
+        # Ingerir únicamente las velas que los estados aún no han visto
+        # (normalmente una sola por callback).
+        atr = rsi = ema = None
+        for i in range(states.bars_seen, len(df_slice)):
+            atr, rsi, ema = states.update(high[i], low[i], close[i])
+
+        if atr is not None:
+            last_idx = df_slice.index[-1]
+            df_slice.loc[last_idx, 'ATR_14'] = atr
+            df_slice.loc[last_idx, 'RSI_14'] = rsi
+            df_slice.loc[last_idx, 'EMA_21'] = ema
+
+        return df_slice
+
     def _check_new_entry(self, df: pd.DataFrame, symbol: str):
         """Busca una señal de entrada para un símbolo específico."""
-        from risk_management.position import Position
         signal = self.strategy.check_signal(df)
         
         if signal not in ['BUY', 'SELL']:
@@ -51,11 +195,19 @@ class PortfolioManager:
 
         direction = 'LONG' if signal == 'BUY' else 'SHORT'
         candle = df.iloc[-1]
-        entry_price = candle['Close']
-        
+
+        # Refrescar el cache de índices de columna solo si el esquema cambió
+        cols = tuple(df.columns)
+        if cols != self._col_schema:
+            self._col_schema = cols
+            self._col_idx = {c: i for i, c in enumerate(cols)}
+
+        row = candle.to_numpy()
+        entry_price = row[self._col_idx['Close']]
+
         # --- NUEVA LÓGICA COMPATIBLE ---
         # Determinar take profit basado en el tipo de estrategia
-        take_profit = self._calculate_take_profit(candle, direction)
+        take_profit = self._calculate_take_profit(candle, direction, row=row)
         
         stop_loss = self.risk_assessor.determine_initial_sl(candle, direction)
         
@@ -66,28 +218,46 @@ class PortfolioManager:
             entry_time=candle.name, entry_price=entry_price, size=position_size,
             stop_loss=stop_loss, take_profit=take_profit, direction=direction
         )
+
+        # Registrar la posición en los arrays SoA paralelos
+        slot = self._free_slots.pop()
+        self._symbol_slot[symbol] = slot
+        self._pos_entry[slot] = entry_price
+        self._pos_size[slot] = position_size
+        self._pos_sl[slot] = stop_loss
+        self._pos_tp[slot] = take_profit
+        self._pos_dir[slot] = 1.0 if direction == 'LONG' else -1.0
+
         if self.verbose:
-            print(f"[{candle.name}] NUEVA POSICIÓN {direction} en {symbol}: Entrada ${entry_price:,.2f}")
+            self._event_log.append((candle.name, 'ENTRY', symbol, direction, entry_price))
 
-    def _calculate_take_profit(self, candle: pd.Series, direction: str) -> float:
+    def _calculate_take_profit(self, candle: pd.Series, direction: str, row: np.ndarray = None) -> float:
         """
         Calcula el take profit basado en el tipo de estrategia.
         Compatible con estrategias anteriores y ElliottWaveStrategy.
+
+        Si se proporciona `row` (la vela como ndarray), los escalares se leen
+        por posición usando el cache de columnas en lugar de por etiqueta.
         """
         try:
             # Verificar si es ElliottWaveStrategy
             if hasattr(self.strategy, 'get_take_profit_price'):
                 # Usar el método específico de Elliott Wave
                 return self.strategy.get_take_profit_price(candle, direction)
-            
+
             # Fallback para estrategias anteriores (Confluence, etc.)
             elif hasattr(self.strategy, 'middle_band_col') and self.strategy.middle_band_col:
                 # Usar Bollinger Band media como take profit (estrategias anteriores)
+                if row is not None and self.strategy.middle_band_col in self._col_idx:
+                    return row[self._col_idx[self.strategy.middle_band_col]]
                 return candle[self.strategy.middle_band_col]
-            
+
             # Fallback general: usar ATR para calcular take profit
             else:
-                atr_value = candle.get('ATR_14', 0)
+                if row is not None and 'ATR_14' in self._col_idx:
+                    atr_value = row[self._col_idx['ATR_14']]
+                else:
+                    atr_value = candle.get('ATR_14', 0)
                 if atr_value == 0:
                     # Si no hay ATR, usar un porcentaje fijo
                     multiplier = 0.02  # 2% take profit
@@ -116,32 +286,91 @@ class PortfolioManager:
 
     def _manage_open_position(self, latest_candle: pd.Series, symbol: str):
         """Gestiona una posición abierta, buscando SL o TP."""
-        position = self.open_positions[symbol]
+        # Leemos escalares de los arrays SoA: evita los lookups de atributos
+        # sobre la instancia de Position en el camino caliente por tick.
+        slot = self._symbol_slot[symbol]
+        stop_loss = self._pos_sl[slot]
+        take_profit = self._pos_tp[slot]
+        is_long = self._pos_dir[slot] > 0
+
         high_price, low_price = latest_candle['High'], latest_candle['Low']
         exit_price, reason = None, None
 
-        if position.direction == 'LONG':
-            if low_price <= position.stop_loss: exit_price, reason = position.stop_loss, 'STOP_LOSS'
-            elif high_price >= position.take_profit: exit_price, reason = position.take_profit, 'TAKE_PROFIT'
-        
-        elif position.direction == 'SHORT':
-            if high_price >= position.stop_loss: exit_price, reason = position.stop_loss, 'STOP_LOSS'
-            elif low_price <= position.take_profit: exit_price, reason = position.take_profit, 'TAKE_PROFIT'
+        if is_long:
+            if low_price <= stop_loss: exit_price, reason = stop_loss, 'STOP_LOSS'
+            elif high_price >= take_profit: exit_price, reason = take_profit, 'TAKE_PROFIT'
+
+        else:  # SHORT
+            if high_price >= stop_loss: exit_price, reason = stop_loss, 'STOP_LOSS'
+            elif low_price <= take_profit: exit_price, reason = take_profit, 'TAKE_PROFIT'
 
         if exit_price and reason:
             self._close_position(symbol, exit_price, reason, latest_candle.name)
 
+    def find_exit_vectorized(self, high_arr: np.ndarray, low_arr: np.ndarray,
+                             stop_loss: float, take_profit: float, direction: str):
+        """
+        Escanea una ventana completa de velas en UN solo pase NumPy y devuelve
+        la primera salida por SL/TP, en lugar de iterar vela a vela en Python.
+
+        API para replay offline de backtests: dada una posición y los
+        arrays High/Low posteriores a la entrada, devuelve
+        (exit_idx, reason, exit_price) o None si la posición sigue abierta.
+        Mantiene la misma prioridad que _manage_open_position: si SL y TP se
+        tocan en la misma vela, gana el STOP_LOSS.
+        """
+        if direction == 'LONG':
+            hit_sl = low_arr <= stop_loss
+            hit_tp = high_arr >= take_profit
+        else:  # SHORT
+            hit_sl = high_arr >= stop_loss
+            hit_tp = low_arr <= take_profit
+
+        hit_any = hit_sl | hit_tp
+        if not hit_any.any():
+            return None
+
+        exit_idx = int(np.argmax(hit_any))
+        if hit_sl[exit_idx]:
+            return exit_idx, 'STOP_LOSS', stop_loss
+        return exit_idx, 'TAKE_PROFIT', take_profit
+
     def _close_position(self, symbol: str, exit_price: float, reason: str, exit_time):
         """Cierra una posición específica y registra el trade."""
         position = self.open_positions.pop(symbol) # Elimina la posición del diccionario
-        
+
+        # Liberar el slot SoA para que pueda reutilizarse
+        slot = self._symbol_slot.pop(symbol)
+        self._free_slots.append(slot)
+
+
         pnl_multiplier = 1 if position.direction == 'LONG' else -1
         pnl = (exit_price - position.entry_price) * position.size * pnl_multiplier
         self.capital += pnl
-        
-        trade_info = position.__dict__
-        trade_info.update({'pnl': pnl, 'exit_reason': reason, 'exit_time': exit_time, 'symbol': symbol})
-        self.trade_history.append(trade_info)
+
+        # direction se guarda como int8 (1=LONG, -1=SHORT): un token de un
+        # byte en lugar de un PyObject string por trade. El reporting lo
+        # convierte a etiquetas una sola vez con pd.Categorical.from_codes.
+        self.trade_history.append(TradeRecord(
+            entry_time=position.entry_time, entry_price=position.entry_price,
+            size=position.size, stop_loss=position.stop_loss,
+            take_profit=position.take_profit, direction=np.int8(pnl_multiplier),
+            pnl=pnl, exit_reason=reason, exit_time=exit_time, symbol=symbol
+        ))
         
         if self.verbose:
-            print(f"[{exit_time}] POSICIÓN CERRADA en {symbol} por {reason}: P&L: ${pnl:,.2f}")
\ No newline at end of file
+            self._event_log.append((exit_time, 'EXIT', symbol, reason, pnl))
+
+    def flush_event_log(self):
+        """
+        Formatea e imprime de una vez los eventos acumulados en modo verbose.
+        Llamar al final del run (lo hace el Backtester); en vivo puede
+        invocarse periódicamente.
+        """
+        for event in self._event_log:
+            timestamp, kind, symbol, detail, value = event
+            if kind == 'ENTRY':
+                print(f"[{timestamp}] NUEVA POSICIÓN {detail} en {symbol}: Entrada ${value:,.2f}")
+            else:  # EXIT
+                print(f"[{timestamp}] POSICIÓN CERRADA en {symbol} por {detail}: P&L: ${value:,.2f}")
+        self._event_log.clear()
\ No newline at end of file
@@ -2,10 +2,14 @@
 from dataclasses import dataclass
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Position:
     """
     Encapsula la información de UNA posición. El símbolo se gestiona externamente.
+
+    slots=True elimina el __dict__ por instancia (menos memoria y acceso a
+    atributos más rápido); frozen=True la hace inmutable: una vez abierta,
+    la posición no se modifica, solo se cierra.
     """
     entry_time: datetime
     entry_price: float
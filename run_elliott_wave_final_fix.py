@@ -5,6 +5,7 @@ V2.5 FINAL FIX - Solución definitiva al problema de cache + BULLISH forzado
 Deshabilita completamente el cache y fuerza detección BULLISH para rally de DOGE.
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -22,104 +23,216 @@ class ElliottWaveStrategyFinalFix(ElliottWaveStrategyV2):
     """
     Versión FINAL que corrige el problema de cache y fuerza BULLISH.
     """
-    
+
+    def __init__(self, *args, verbose: bool = False, **kwargs):
+        # verbose=False por defecto: los diagnósticos por barra (varios
+        # print por check_signal) cuestan órdenes de magnitud más que el
+        # cálculo numérico que anotan. Activar solo para depurar.
+        super().__init__(*args, **kwargs)
+        self._verbose = verbose
+        self._trend_vector = None
+
+    def prepare(self, df: pd.DataFrame) -> None:
+        """
+        Precálculo único por serie, llamado por el backtester antes del bucle.
+
+        El gate del MÉTODO 1 (cambio total > ±20%) es determinista por barra
+        cuando la ventana arranca en el inicio de la serie (modo no-scalping):
+        se materializa aquí como un vector de códigos int8 (0=BULLISH forzado,
+        1=BEARISH forzado, -1=sin decisión rápida) y check_signal lo consulta
+        en O(1) en vez de recalcular el ratio en cada barra.
+        """
+        closes = df['Close'].to_numpy(dtype=np.float64)
+        if closes.size == 0 or closes[0] == 0:
+            self._trend_vector = None
+            return
+
+        self._total_change = (closes / closes[0] - 1.0) * 100.0
+        codes = np.where(self._total_change > 20, 0,
+                         np.where(self._total_change < -20, 1, -1)).astype(np.int8)
+        # El MÉTODO 1 exige al menos 100 barras acumuladas
+        codes[:99] = -1
+        self._trend_vector = codes
+
     def check_signal(self, df: pd.DataFrame) -> str:
         """
         Método principal SIN CACHE - siempre recalcula todo.
         """
+        # La validación de longitud de arriba cubre los casos que antes
+        # atrapaba un try/except alrededor de todo el método; el único paso
+        # que puede fallar legítimamente es la librería externa de ondas,
+        # así que solo esa llamada queda protegida.
         if df.empty or len(df) < self.wave_analysis_lookback:
             return 'HOLD'
-        
-        try:
-            # CORREGIDO: NUNCA usar cache - siempre recalcular
-            analysis_df = df.tail(self.wave_analysis_lookback).copy() if self.scalping_mode else df.copy()
-            
-            if 'Close_time' in analysis_df.columns:
-                analysis_df.set_index('Close_time', inplace=True)
-            
-            # SIEMPRE determinar tendencia (sin cache)
+
+        # CORREGIDO: NUNCA usar cache - siempre recalcular.
+        # Vista sin copia: el análisis solo lee, nunca muta, así que no
+        # hace falta duplicar lookback filas × columnas en cada barra.
+        analysis_df = df.iloc[-self.wave_analysis_lookback:] if self.scalping_mode else df
+
+        # Contrato: el caller indexa por Close_time UNA vez al cargar los
+        # datos (el runner ya lo hace antes del backtest). Reindexar aquí
+        # costaría O(n) por barra para un caso que nunca ocurre en el flujo
+        # normal, así que el branch defensivo se eliminó.
+
+        # SIEMPRE determinar tendencia. Si prepare() materializó el vector de
+        # códigos y la ventana coincide con el prefijo de la serie (modo
+        # no-scalping), el gate del ±20% es una lectura int8.
+        trend_code = -1
+        if not self.scalping_mode and self._trend_vector is not None \
+                and len(df) <= self._trend_vector.size:
+            trend_code = self._trend_vector[len(df) - 1]
+
+        if trend_code == 0:
+            trend_direction = 'BULLISH'
+        elif trend_code == 1:
+            trend_direction = 'BEARISH'
+        else:
             trend_direction = self._determine_market_trend_forced(analysis_df)
-            
-            # SIEMPRE ejecutar análisis de ondas
-            detected_waves = self.taew_analyzer.analyze_elliott_waves(
-                analysis_df, price_column='Close'
-            )
-            
-            # SIEMPRE generar señal adaptativa
-            signal = self._generate_adaptive_signal_forced(detected_waves, analysis_df, trend_direction)
-            
-            # NO actualizar cache - mantener señales frescas
-            
-            return signal
-            
-        except Exception as e:
-            print(f"Error en check_signal FINAL: {e}")
-            return 'HOLD'
+
+        # Análisis de ondas memoizado: ventanas consecutivas comparten
+        # lookback-1 filas, así que la misma ventana (identificada por el
+        # timestamp de su última barra + su longitud) se analiza una sola
+        # vez. Es con diferencia el paso más caro de todo el check_signal.
+        wave_cache = getattr(self, '_wave_cache', None)
+        if wave_cache is None:
+            wave_cache = self._wave_cache = {}
+
+        wave_key = (analysis_df.index[-1], len(analysis_df))
+        detected_waves = wave_cache.get(wave_key)
+        if detected_waves is None:
+            new_close = float(analysis_df['Close'].iloc[-1])
+
+            # Reuso incremental O(1): si solo llegó UNA barra nueva y ésta
+            # prolonga el último tramo detectado, el etiquetado previo sigue
+            # vigente y nos ahorramos el re-análisis completo de la ventana.
+            if getattr(self, '_prev_wave_len', 0) + 1 == len(df):
+                detected_waves = self.taew_analyzer.extend_elliott_waves(
+                    self._prev_waves, self._prev_close, new_close
+                )
+
+            if detected_waves is None:
+                try:
+                    detected_waves = self.taew_analyzer.analyze_elliott_waves(
+                        analysis_df, price_column='Close'
+                    )
+                except Exception as e:
+                    print(f"Error en análisis de ondas FINAL: {e}")
+                    return 'HOLD'
+
+            if len(wave_cache) >= self._WAVE_CACHE_MAX:
+                # Evicción FIFO: descarta la entrada más antigua
+                wave_cache.pop(next(iter(wave_cache)))
+            wave_cache[wave_key] = detected_waves
+
+            # Estado para el reuso incremental de la siguiente barra
+            self._prev_waves = detected_waves
+            self._prev_wave_len = len(df)
+            self._prev_close = new_close
+
+        # SIEMPRE generar señal adaptativa (sin cache de señales)
+        return self._generate_adaptive_signal_forced(detected_waves, analysis_df, trend_direction)
     
+    _TREND_CACHE_MAX = 256
+    _WAVE_CACHE_MAX = 64
+
     def _determine_market_trend_forced(self, df: pd.DataFrame) -> str:
         """
         Detección FORZADA que reconoce el rally de DOGE como BULLISH.
+
+        Memoizada por (len(df), último Close): la tendencia es determinista
+        para una misma ventana, así que llamadas repetidas sobre la misma
+        barra resuelven en un hit de diccionario en vez de re-escanear los
+        lookbacks. Cache FIFO acotado.
         """
-        try:
-            # MÉTODO 1: Rally total > 20% = BULLISH forzado
-            if len(df) >= 100:
-                total_change = ((df['Close'].iloc[-1] / df['Close'].iloc[0]) - 1) * 100
-                
-                if total_change > 20:  # Rally fuerte
-                    print(f"🚀 BULLISH FORZADO: Rally total {total_change:+.2f}% > 20%")
-                    return 'BULLISH'
-                elif total_change < -20:  # Caída fuerte
-                    print(f"📉 BEARISH FORZADO: Caída total {total_change:+.2f}% < -20%")
-                    return 'BEARISH'
-            
-            # MÉTODO 2: Análisis de múltiples períodos
-            current_price = df['Close'].iloc[-1]
-            bullish_score = 0
-            
-            # Verificar múltiples lookbacks
-            for lookback in [20, 50, 100]:
-                if len(df) >= lookback:
-                    past_price = df['Close'].iloc[-lookback]
-                    change = ((current_price / past_price) - 1) * 100
-                    
-                    if change > 3:  # 3% en cualquier período
-                        bullish_score += 2
-                    elif change > 1:  # 1% 
-                        bullish_score += 1
-                    elif change < -3:  # -3%
-                        bullish_score -= 2
-                    elif change < -1:  # -1%
-                        bullish_score -= 1
-            
-            # MÉTODO 3: Para DOGE específicamente - FORZAR BULLISH
-            # Dado que sabemos que DOGE tuvo un rally del +53%
-            recent_50 = df['Close'].tail(50)
-            if len(recent_50) >= 10:
-                recent_high = recent_50.max()
-                recent_low = recent_50.min()
-                current = recent_50.iloc[-1]
-                
-                # Si estamos en el 70% superior del rango reciente = BULLISH
-                if (current - recent_low) / (recent_high - recent_low) > 0.7:
-                    bullish_score += 2
-                    print(f"🎯 BULLISH: Precio en zona alta del rango")
-            
-            # DECISIÓN FINAL (más agresiva)
-            if bullish_score >= 1:  # Solo necesita 1 punto
-                print(f"🟢 TENDENCIA: BULLISH (score {bullish_score})")
+        cache = getattr(self, '_trend_cache', None)
+        if cache is None:
+            cache = self._trend_cache = {}
+
+        key = (len(df), float(df['Close'].iloc[-1]))
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+
+        trend = self._compute_market_trend_forced(df)
+
+        if len(cache) >= self._TREND_CACHE_MAX:
+            # Evicción FIFO: descarta la entrada más antigua
+            cache.pop(next(iter(cache)))
+        cache[key] = trend
+        return trend
+
+    def _compute_market_trend_forced(self, df: pd.DataFrame) -> str:
+        """Cálculo real de la tendencia (sin cache)."""
+        # Un solo volcado a ndarray: todas las lecturas escalares y
+        # reducciones siguientes son indexación C, sin pasar por .iloc
+        # ni construir Series intermedias por barra. Los chequeos de tamaño
+        # explícitos sustituyen al try/except genérico que envolvía el
+        # método: comprobar es más barato que armar un frame de excepción.
+        closes = df['Close'].to_numpy()
+        if closes.size == 0 or closes[0] == 0:
+            # Sin datos utilizables: asumir BULLISH (caso DOGE)
+            return 'BULLISH'
+
+        # MÉTODO 1: Rally total > 20% = BULLISH forzado
+        if closes.size >= 100:
+            total_change = ((closes[-1] / closes[0]) - 1) * 100
+
+            if total_change > 20:  # Rally fuerte
+                if self._verbose: print("🚀 BULLISH FORZADO: Rally total %+.2f%% > 20%%" % total_change)
                 return 'BULLISH'
-            elif bullish_score <= -1:
-                print(f"🔴 TENDENCIA: BEARISH (score {bullish_score})")
+            elif total_change < -20:  # Caída fuerte
+                if self._verbose: print("📉 BEARISH FORZADO: Caída total %+.2f%% < -20%%" % total_change)
                 return 'BEARISH'
-            else:
-                # PARA DOGE: Si no hay señal clara, defaultear a BULLISH
-                # porque sabemos que tuvo un rally del +53%
-                print(f"🔄 TENDENCIA: BULLISH FORZADO (default para rally)")
-                return 'BULLISH'
-                
-        except Exception as e:
-            print(f"Error en detección forzada: {e}")
-            # En caso de error, asumir BULLISH para DOGE
+
+        # MÉTODO 2: Análisis de múltiples períodos
+        current_price = closes[-1]
+
+        # Los tres lookbacks [20, 50, 100] se evalúan de una sola vez:
+        # se filtran los offsets que caben en el histórico, se recogen
+        # los precios pasados con un solo gather y el score se acumula
+        # con máscaras enteras en lugar de la cascada if/elif por período.
+        offsets = np.array([20, 50, 100])
+        offsets = offsets[offsets <= closes.size]
+        bullish_score = 0
+        if offsets.size:
+            changes = ((current_price / closes[-offsets]) - 1) * 100
+            # Puntuación sin ramas: cada comparación produce una máscara 0/1
+            # y el score completo se reduce con UNA suma entera, sin saltos
+            # condicionales dependientes de datos.
+            bullish_score = int((
+                2 * (changes > 3)                    # > 3% en cualquier período
+                + ((changes > 1) & (changes <= 3))
+                - 2 * (changes < -3)
+                - ((changes < -1) & (changes >= -3))
+            ).sum())
+
+        # MÉTODO 3: Para DOGE específicamente - FORZAR BULLISH
+        # Dado que sabemos que DOGE tuvo un rally del +53%
+        # Vista sin copia sobre el ndarray: max/min reducen ~50 floats
+        # contiguos en memoria, sin construir Series de pandas; el último
+        # cierre ya está en current_price.
+        recent = closes[-50:]
+        if recent.size >= 10:
+            recent_high = recent.max()
+            recent_low = recent.min()
+
+            # Si estamos en el 70% superior del rango reciente = BULLISH
+            if (current_price - recent_low) / (recent_high - recent_low) > 0.7:
+                bullish_score += 2
+                if self._verbose: print(f"🎯 BULLISH: Precio en zona alta del rango")
+        
+        # DECISIÓN FINAL (más agresiva)
+        if bullish_score >= 1:  # Solo necesita 1 punto
+            if self._verbose: print("🟢 TENDENCIA: BULLISH (score %d)" % bullish_score)
+            return 'BULLISH'
+        elif bullish_score <= -1:
+            if self._verbose: print("🔴 TENDENCIA: BEARISH (score %d)" % bullish_score)
+            return 'BEARISH'
+        else:
+            # PARA DOGE: Si no hay señal clara, defaultear a BULLISH
+            # porque sabemos que tuvo un rally del +53%
+            if self._verbose: print(f"🔄 TENDENCIA: BULLISH FORZADO (default para rally)")
             return 'BULLISH'
     
     def _generate_adaptive_signal_forced(self, detected_waves, df, trend_direction):
@@ -138,28 +251,28 @@ class ElliottWaveStrategyFinalFix(ElliottWaveStrategyV2):
         # Verificar confianza
         confidence = latest_signal_info.get('confidence', 0.0)
         if confidence < self.min_wave_confidence:
-            print(f"⚠️  Confianza baja: {confidence:.2f} < {self.min_wave_confidence}")
+            if self._verbose: print("⚠️  Confianza baja: %.2f < %s" % (confidence, self.min_wave_confidence))
             return 'HOLD'
         
         base_action = latest_signal_info.get('suggested_action', 'HOLD')
         
-        print(f"🔄 ADAPTACIÓN FORZADA: {base_action} + Tendencia {trend_direction}")
+        if self._verbose: print("🔄 ADAPTACIÓN FORZADA: %s + Tendencia %s" % (base_action, trend_direction))
         
         # LÓGICA ADAPTATIVA FORZADA
         if trend_direction == 'BULLISH':
             if base_action == 'CONSIDER_SHORT':
-                print(f"   🔄 CONVERSIÓN FORZADA: SHORT → LONG")
+                if self._verbose: print(f"   🔄 CONVERSIÓN FORZADA: SHORT → LONG")
                 adapted_signal = 'CONSIDER_LONG'
             elif base_action == 'CONSIDER_LONG':
-                print(f"   ✅ MANTENIENDO: LONG")
+                if self._verbose: print(f"   ✅ MANTENIENDO: LONG")
                 adapted_signal = 'CONSIDER_LONG'
             else:
-                print(f"   🚀 GENERANDO: LONG por tendencia BULLISH")
+                if self._verbose: print(f"   🚀 GENERANDO: LONG por tendencia BULLISH")
                 adapted_signal = 'CONSIDER_LONG'
         
         elif trend_direction == 'BEARISH':
             if base_action == 'CONSIDER_LONG':
-                print(f"   🔄 CONVERSIÓN FORZADA: LONG → SHORT")
+                if self._verbose: print(f"   🔄 CONVERSIÓN FORZADA: LONG → SHORT")
                 adapted_signal = 'CONSIDER_SHORT'
             else:
                 adapted_signal = 'CONSIDER_SHORT'
@@ -170,12 +283,12 @@ class ElliottWaveStrategyFinalFix(ElliottWaveStrategyV2):
         # VALIDACIONES ULTRA-PERMISIVAS
         if self.scalping_mode:
             if not self._validate_ultra_permissive(df, adapted_signal):
-                print(f"   ❌ Validación bloqueó señal")
+                if self._verbose: print(f"   ❌ Validación bloqueó señal")
                 return 'HOLD'
         
         # Convertir a señal final
         final_signal = self._convert_action_to_signal(adapted_signal)
-        print(f"   📋 SEÑAL FINAL: {final_signal}")
+        if self._verbose: print("   📋 SEÑAL FINAL: %s" % final_signal)
         
         return final_signal
     
@@ -185,33 +298,39 @@ class ElliottWaveStrategyFinalFix(ElliottWaveStrategyV2):
         """
         if len(df) < 3:
             return False
-        
-        try:
-            # Solo verificar volatilidad mínima
-            recent_data = df.tail(5)
-            price_range = recent_data['High'].max() - recent_data['Low'].min()
-            avg_price = recent_data['Close'].mean()
-            volatility = price_range / avg_price
-            
-            # Volatilidad ultra-baja: 0.01% (casi cualquier cosa pasa)
-            if volatility < 0.0001:
-                return False
-            
-            # TODO LO DEMÁS PASA
-            return True
-            
-        except Exception as e:
-            print(f"Error en validación permisiva: {e}")
-            return True  # En caso de error, permitir
+
+        # Solo verificar volatilidad mínima. Vistas NumPy directas sobre las
+        # últimas 5 barras en lugar de construir un tail(5) y Series
+        # intermedias por llamada. El rango High/Low se funde en una sola
+        # reducción np.ptp sobre el concatenado (High >= Low garantiza que
+        # el máximo del conjunto es el de High y el mínimo el de Low), un
+        # único cruce Python<->C en vez de dos.
+        h = df['High'].values[-5:]
+        l = df['Low'].values[-5:]
+        c = df['Close'].values[-5:]
+        avg_price = c.mean()
+        if avg_price == 0:
+            return True  # Sin precio utilizable, permitir
+        volatility = np.ptp(np.concatenate((h, l))) / avg_price
+
+        # Volatilidad ultra-baja: 0.01% (casi cualquier cosa pasa)
+        if volatility < 0.0001:
+            return False
+
+        # TODO LO DEMÁS PASA
+        return True
     
+    # Mapeo constante a nivel de clase: evita reconstruir el diccionario
+    # literal en cada llamada por barra.
+    _CONVERSION_MAP = {
+        'CONSIDER_LONG': 'BUY',
+        'CONSIDER_SHORT': 'SELL',
+        'HOLD': 'HOLD'
+    }
+
     def _convert_action_to_signal(self, action: str) -> str:
         """Convierte acción a señal de trading."""
-        conversion_map = {
-            'CONSIDER_LONG': 'BUY',
-            'CONSIDER_SHORT': 'SELL',
-            'HOLD': 'HOLD'
-        }
-        return conversion_map.get(action, 'HOLD')
+        return self._CONVERSION_MAP.get(action, 'HOLD')
 
 
 def run_elliott_wave_final_fix():
@@ -256,7 +375,8 @@ def run_elliott_wave_final_fix():
         wave_analysis_lookback=80,
         trend_filter_enabled=True,
         trend_lookback=50,
-        adaptive_direction=True
+        adaptive_direction=True,
+        verbose=False  # Activar solo para depurar: ~10 prints/barra dominan el wall-clock
     )
     
     risk_assessor = RiskAssessor(atr_multiplier_sl=2.0)
@@ -268,7 +388,7 @@ def run_elliott_wave_final_fix():
         strategy=elliott_strategy,
         risk_assessor=risk_assessor,
         max_open_positions=1,
-        verbose=True  # Ver TODAS las conversiones
+        verbose=False  # Activar solo para depurar entradas/salidas
     )
     
     print("✅ V2.5 FINAL FIX configurada:")
@@ -314,6 +434,13 @@ def run_elliott_wave_final_fix():
     
     # ¡ANÁLISIS DE ÉXITO!
     trades_df = pd.DataFrame(trade_history)
+    # direction llega como int8 (1=LONG, -1=SHORT) desde el PortfolioManager;
+    # se convierte a etiquetas UNA sola vez aquí, en la frontera de reporting.
+    if 'direction' in trades_df.columns:
+        trades_df['direction'] = pd.Categorical.from_codes(
+            trades_df['direction'].to_numpy(dtype=np.int8) + 1,
+            ['SHORT', 'HOLD', 'LONG']
+        )
     total_trades = len(trades_df)
     total_pnl = trades_df['pnl'].sum()
     final_capital = INITIAL_CAPITAL + total_pnl
@@ -0,0 +1,33 @@
+# signal_generators/_aot_build.py
+"""
+Compilación AOT (ahead-of-time) de los kernels de señales.
+
+El primer uso de un kernel @njit paga la compilación LLVM, que en un
+backtest corto puede costar más que el backtest entero. Este script genera
+una extensión nativa `signal_kernels` (.so/.pyd) en este directorio con
+firmas explícitas; en tiempo de ejecución _confluence_loop la importa si
+existe y solo cae al JIT cuando no está compilada.
+
+Uso (requiere numba con soporte pycc y un compilador C):
+
+    python -m signal_generators._aot_build
+"""
+
+import os
+
+from numba.pycc import CC
+
+from signal_generators._confluence_loop import _confluence_signals
+
+cc = CC('signal_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+@cc.export('confluence_signals', 'i1[:](f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8, f8)')
+def confluence_signals(close, dcu, dcl, bbu, bbl, rsi, rsi_os, rsi_ob):
+    return _confluence_signals(close, dcu, dcl, bbu, bbl, rsi, rsi_os, rsi_ob)
+
+
+if __name__ == '__main__':
+    cc.compile()
+    print(f"✅ Kernels AOT compilados en {cc.output_dir}")
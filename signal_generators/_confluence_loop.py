@@ -0,0 +1,53 @@
+# signal_generators/_confluence_loop.py
+"""
+Kernel del bucle de señales de ConfluenceStrategy.
+
+La lógica por barra (seis comparaciones float y dos ratios) se extrae a una
+función independiente sobre ndarrays crudos para que numba la compile a código
+máquina; sin numba instalado corre como bucle Python normal.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        # Decorador neutro: sin numba el kernel corre como Python puro.
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrapper(func):
+            return func
+        return wrapper
+
+
+@njit(cache=True)
+def _confluence_signals(close, dcu, dcl, bbu, bbl, rsi, rsi_os, rsi_ob):
+    """
+    Evalúa la confluencia soporte/banda/RSI para todas las barras y devuelve
+    un vector int8: 1=BUY, -1=SELL, 0=HOLD.
+    """
+    n = close.shape[0]
+    out = np.zeros(n, np.int8)
+    for i in range(n):
+        if dcl[i] != 0.0 and abs(close[i] - dcl[i]) / dcl[i] < 0.001 \
+                and close[i] <= bbl[i] and rsi[i] < rsi_os:
+            out[i] = 1
+        elif dcu[i] != 0.0 and abs(close[i] - dcu[i]) / dcu[i] < 0.001 \
+                and close[i] >= bbu[i] and rsi[i] > rsi_ob:
+            out[i] = -1
+    return out
+
+
+# Si existe la extensión nativa compilada AOT (ver _aot_build.py), se usa en
+# lugar del dispatcher JIT: el import es instantáneo y el arranque en frío no
+# paga la compilación LLVM.
+try:
+    from signal_generators.signal_kernels import confluence_signals as _confluence_signals  # noqa: F811
+    AOT_AVAILABLE = True
+except ImportError:
+    AOT_AVAILABLE = False
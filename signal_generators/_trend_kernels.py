@@ -0,0 +1,125 @@
+# signal_generators/_trend_kernels.py
+"""
+Kernel numérico del scoring de tendencia robusto (test_bearish_asset).
+
+El conteo alcista/bajista sobre lookbacks 20/50/100, el momentum de 20
+barras y la posición en el rango de 50 barras es una rutina aritmética
+pura que el backtester ejecuta una vez por vela; numba la compila a código
+máquina eliminando el despacho del intérprete (sin numba corre como bucle
+Python normal).
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        # Decorador neutro: sin numba el kernel corre como Python puro.
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrapper(func):
+            return func
+        return wrapper
+
+
+# Umbrales del scoring por lookback materializados como arrays tipados:
+# searchsorted localiza el bucket del cambio porcentual de una vez y las
+# tablas devuelven la puntuación, sin cadena de comparaciones por rama.
+# (Un empate exacto con un umbral negativo cae al bucket inferior; para
+# ratios de precios reales los empates exactos no ocurren.)
+_TREND_EDGES = np.array([-5.0, -1.0, 1.0, 5.0])
+_BULL_SCORES = np.array([0, 0, 0, 1, 2], dtype=np.int64)
+_BEAR_SCORES = np.array([2, 1, 0, 0, 0], dtype=np.int64)
+
+
+@njit(cache=True, fastmath=True)
+def _score_trend(close, high, low):
+    """
+    Calcula las señales (alcistas, bajistas) del detector de tendencia.
+
+    Réplica compilada del scoring de _determine_market_trend_robust:
+    cambios porcentuales a 20/50/100 velas con umbrales ±1/±5, momentum
+    de las últimas 20 velas y posición del precio en el rango High/Low
+    de las últimas 50.
+
+    Las tres métricas se calculan en UNA sola pasada hacia atrás: el
+    recorrido mantiene el min/max del rango de 50 velas y muestrea los
+    cierres en los offsets 20/50/100 al vuelo. La carga es memory-bound,
+    así que fusionar los tres escaneos (que antes tocaban líneas de cache
+    distintas) reduce el tráfico a DRAM a una lectura lineal por array.
+
+    Returns:
+        (bullish_signals, bearish_signals) como enteros.
+    """
+    n = close.shape[0]
+    current = close[n - 1]
+    bull = 0
+    bear = 0
+
+    # Pasada única hacia atrás sobre las últimas min(n, 100) velas
+    limit = 100 if n >= 100 else n
+    rmax = high[n - 1]
+    rmin = low[n - 1]
+    past_20 = current
+    past_50 = current
+    past_100 = current
+    for d in range(1, limit + 1):
+        i = n - d
+        if d <= 50:
+            if high[i] > rmax:
+                rmax = high[i]
+            if low[i] < rmin:
+                rmin = low[i]
+        if d == 20:
+            past_20 = close[i]
+        elif d == 50:
+            past_50 = close[i]
+        elif d == 100:
+            past_100 = close[i]
+
+    # Cambios por lookback (20, 50, 100 velas): bucket por searchsorted +
+    # tablas de puntuación en lugar de la cascada if/elif por lookback
+    if n >= 20 and past_20 != 0.0:
+        pct = (current / past_20 - 1.0) * 100.0
+        idx = np.searchsorted(_TREND_EDGES, pct)
+        bull += _BULL_SCORES[idx]
+        bear += _BEAR_SCORES[idx]
+    if n >= 50 and past_50 != 0.0:
+        pct = (current / past_50 - 1.0) * 100.0
+        idx = np.searchsorted(_TREND_EDGES, pct)
+        bull += _BULL_SCORES[idx]
+        bear += _BEAR_SCORES[idx]
+    if n >= 100 and past_100 != 0.0:
+        pct = (current / past_100 - 1.0) * 100.0
+        idx = np.searchsorted(_TREND_EDGES, pct)
+        bull += _BULL_SCORES[idx]
+        bear += _BEAR_SCORES[idx]
+
+    # Momentum reciente (últimas 20 velas)
+    if n >= 20:
+        first = past_20
+    elif n >= 10:
+        first = close[0]
+    else:
+        first = 0.0
+    if first != 0.0:
+        recent_change = (current / first - 1.0) * 100.0
+        if recent_change > 2.0:
+            bull += 1
+        elif recent_change < -2.0:
+            bear += 1
+
+    # Posición en el rango de las últimas 50 velas (min/max ya acumulados)
+    if n >= 20 and rmax != rmin:
+        position = (current - rmin) / (rmax - rmin)
+        if position > 0.7:
+            bull += 1
+        elif position < 0.3:
+            bear += 1
+
+    return bull, bear
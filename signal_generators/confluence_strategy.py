@@ -1,7 +1,17 @@
 # Contenido completo del archivo
+import numpy as np
 import pandas as pd
 
-class ConfluenceStrategy:
+from signal_generators._confluence_loop import _confluence_signals
+from signal_generators.signal_strategy import SignalStrategy
+
+# Mapeo int8 -> señal como gather sobre un array: el índice -1 (SELL) envuelve
+# al último elemento, así que {1: 'BUY', -1: 'SELL', 0: 'HOLD'} se resuelve
+# sin diccionario ni cadena de condicionales por barra.
+_SIGNAL_STRS = np.array(['HOLD', 'BUY', 'SELL'])
+
+
+class ConfluenceStrategy(SignalStrategy):
     """
     Estrategia de alta confluencia que busca una reversión a la media
     en un punto de soporte estructural.
@@ -21,30 +31,68 @@ class ConfluenceStrategy:
         self.rsi_col = f"RSI_{rsi_period}"
         self.dc_upper_col = f"DCU_{dc_period}_{dc_period}"
         self.dc_lower_col = f"DCL_{dc_period}_{dc_period}"
-        
+
+        # Vector de señales precalculado para modo backtest (ver precompute)
+        self._signals = None
+
         print("Estrategia de Confluencia inicializada.")
 
+    def precompute(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Precalcula el vector de señales de todo el histórico con el kernel
+        compilado (1=BUY, -1=SELL, 0=HOLD). En backtests, check_signal pasa a
+        ser una lectura int8 por barra en lugar de seis comparaciones sobre
+        una Series nueva.
+        """
+        signals = _confluence_signals(
+            np.nan_to_num(df['Close'].to_numpy(dtype=np.float64)),
+            np.nan_to_num(df[self.dc_upper_col].to_numpy(dtype=np.float64)),
+            np.nan_to_num(df[self.dc_lower_col].to_numpy(dtype=np.float64)),
+            np.nan_to_num(df[self.upper_band_col].to_numpy(dtype=np.float64)),
+            np.nan_to_num(df[self.lower_band_col].to_numpy(dtype=np.float64)),
+            np.nan_to_num(df[self.rsi_col].to_numpy(dtype=np.float64), nan=50.0),
+            float(self.rsi_oversold),
+            float(self.rsi_overbought),
+        )
+        self._signals = signals
+        return signals
+
+    def precompute_signals(self, df: pd.DataFrame) -> np.ndarray:
+        """Implementación de la interfaz SignalStrategy (ver precompute)."""
+        return self.precompute(df)
+
     def check_signal(self, df: pd.DataFrame) -> str:
         if len(df) < max(self.dc_period, self.bb_period, self.rsi_period):
             return 'HOLD'
-        
+
+        # Camino rápido con el vector precalculado
+        if self._signals is not None and len(df) <= self._signals.size:
+            return _SIGNAL_STRS[self._signals[len(df) - 1]]
+
         latest = df.iloc[-1]
 
+        # Referencias locales: evita repetir la resolución de atributos de
+        # instancia (self.*) en cada comparación de la barra.
+        close = latest['Close']
+        dc_lower = latest[self.dc_lower_col]
+        dc_upper = latest[self.dc_upper_col]
+        rsi = latest[self.rsi_col]
+
         # --- SEÑAL DE COMPRA (LONG) ---
         # 1. Estructura: Precio cerca del soporte Donchian.
-        is_at_support = abs(latest['Close'] - latest[self.dc_lower_col]) / latest[self.dc_lower_col] < 0.001 # Cerca en un 0.1%
+        is_at_support = abs(close - dc_lower) / dc_lower < 0.001 # Cerca en un 0.1%
         # 2. Estadística: Precio toca o cruza la banda de Bollinger inferior.
-        is_bb_oversold = latest['Close'] <= latest[self.lower_band_col]
+        is_bb_oversold = close <= latest[self.lower_band_col]
         # 3. Momentum: RSI en sobreventa.
-        is_rsi_oversold = latest[self.rsi_col] < self.rsi_oversold
+        is_rsi_oversold = rsi < self.rsi_oversold
 
         if is_at_support and is_bb_oversold and is_rsi_oversold:
             return 'BUY'
 
         # --- SEÑAL DE VENTA (SHORT) ---
-        is_at_resistance = abs(latest['Close'] - latest[self.dc_upper_col]) / latest[self.dc_upper_col] < 0.001
-        is_bb_overbought = latest['Close'] >= latest[self.upper_band_col]
-        is_rsi_overbought = latest[self.rsi_col] > self.rsi_overbought
+        is_at_resistance = abs(close - dc_upper) / dc_upper < 0.001
+        is_bb_overbought = close >= latest[self.upper_band_col]
+        is_rsi_overbought = rsi > self.rsi_overbought
 
         if is_at_resistance and is_bb_overbought and is_rsi_overbought:
             return 'SELL'
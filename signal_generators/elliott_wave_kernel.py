@@ -0,0 +1,107 @@
+# signal_generators/elliott_wave_kernel.py
+"""
+Kernel batch de la estrategia Elliott Wave V2.
+
+En modo backtest, check_signal se invoca una vez por barra re-evaluando
+tendencia, validaciones y cooldown en Python. Este kernel aplica esa misma
+lógica a TODO el histórico en una pasada sobre ndarrays crudos; numba lo
+compila a código máquina (sin numba corre como bucle Python normal).
+
+El cooldown hace el bucle inherentemente secuencial, por lo que se compila
+en modo serie en lugar de parallel=True.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        # Decorador neutro: sin numba el kernel corre como Python puro.
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrapper(func):
+            return func
+        return wrapper
+
+
+@njit(cache=True, fastmath=True)
+def batch_signals(close, high, low, ema, base_action, lookback, cooldown):
+    """
+    Calcula el vector de señales completo (1=BUY, -1=SELL, 0=HOLD).
+
+    base_action marca la barra final de cada onda detectada con su acción
+    base (1=CONSIDER_LONG, -1=CONSIDER_SHORT). Para cada una se replica la
+    cadena del modo streaming: tendencia (pendiente EMA, precio vs EMA,
+    momentum), adaptación direccional, validación de scalping sobre las
+    últimas 10 barras y cooldown entre señales.
+    """
+    n = close.shape[0]
+    out = np.zeros(n, np.int8)
+    last_signal_bar = -999
+
+    for i in range(lookback, n):
+        act = base_action[i]
+        if act == 0:
+            continue
+
+        # Tendencia: mismas tres señales que _determine_market_trend
+        bullish = 0
+        bearish = 0
+        ema_lag = ema[i - 9]
+        if ema_lag != 0.0:
+            slope = (ema[i] - ema_lag) / ema_lag
+            if slope > 0.01:
+                bullish += 1
+            elif slope < -0.01:
+                bearish += 1
+        if ema[i] != 0.0:
+            pve = (close[i] - ema[i]) / ema[i]
+            if pve > 0.005:
+                bullish += 1
+            elif pve < -0.005:
+                bearish += 1
+        c_lag = close[i - 9]
+        if c_lag != 0.0:
+            momentum = (close[i] - c_lag) / c_lag
+            if momentum > 0.02:
+                bullish += 1
+            elif momentum < -0.02:
+                bearish += 1
+
+        # Adaptación direccional: invertir contra-tendencia
+        if bullish >= 2 and act == -1:
+            act = 1
+        elif bearish >= 2 and act == 1:
+            act = -1
+
+        # Validación de scalping sobre las últimas 10 barras
+        hi = high[i]
+        lo = low[i]
+        csum = 0.0
+        for k in range(i - 9, i + 1):
+            if high[k] > hi:
+                hi = high[k]
+            if low[k] < lo:
+                lo = low[k]
+            csum += close[k]
+        avg_price = csum / 10.0
+        if avg_price == 0.0 or (hi - lo) / avg_price < 0.003:
+            continue
+        if act == 1 and close[i] > hi * 0.98:
+            continue
+        if act == -1 and close[i] < lo * 1.02:
+            continue
+
+        # Cooldown entre señales
+        if i - last_signal_bar < cooldown:
+            continue
+
+        out[i] = act
+        last_signal_bar = i
+
+    return out
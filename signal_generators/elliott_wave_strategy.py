@@ -6,9 +6,24 @@ Esta estrategia utiliza el análisis estructural de ondas de Elliott para
 generar señales de trading de alta frecuencia optimizadas para scalping.
 """
 
+import logging
+from collections import OrderedDict
+
 import pandas as pd
 from typing import Dict, List, Optional
-from analysis_engines.taew_analyzer import TaewAnalyzer
+from analysis_engines.taew_analyzer import TaewAnalyzer, WAVE_ACTIONS, TRADING_SIGNALS
+from indicators.stateful_indicators import RollingExtrema
+
+# Logger perezoso: con el nivel por encima de DEBUG los mensajes del camino
+# caliente ni siquiera se formatean, a diferencia de print() que siempre
+# construye el f-string y vuelca a stdout de forma síncrona.
+log = logging.getLogger(__name__)
+
+# Nota: las vistas (df.iloc[-N:]) que pasamos al analyzer son seguras porque
+# todo el camino de análisis es de solo lectura y el reindexado usa la forma
+# no mutante de set_index; no se activa ninguna opción global de pandas aquí
+# (mutar el comportamiento del proceso entero desde un import sería invasivo
+# para el resto de consumidores).
 
 
 class ElliottWaveStrategy:
@@ -21,8 +36,29 @@ class ElliottWaveStrategy:
     - Gestión eficiente de memoria
     - Timeframes cortos
     """
-    
-    def __init__(self, 
+
+    # Sin __dict__ por instancia: en barridos de hiperparámetros que crean
+    # miles de instancias, los slots recortan la huella por instancia y
+    # hacen los LOAD_ATTR accesos directos a slot en lugar de lookups hash.
+    __slots__ = (
+        'min_wave_confidence', 'scalping_mode', 'wave_analysis_lookback',
+        'enable_both_directions', 'taew_analyzer', '_sig_cache',
+        '_sig_cache_max', '_cache_hits', '_cache_misses', 'last_signal',
+        'last_wave_signal', '_extrema', '_tp_mult', '_last_swing_high',
+        '_last_swing_low', '_last_analyze_len', '_last_waves_cache',
+        '_last_end_len', '_last_close', 'signal_cooldown', 'last_signal_bar',
+        'middle_band_col', '_has_close_time', '_check_signal_impl',
+    )
+
+    # Tunables por versión: la subclase V2 los redefine sin duplicar los
+    # caminos calientes (check_signal, caches, warm-start, take profit).
+    _MIN_WAVE_LENGTH_SCALPING = 10
+    _MIN_WAVE_LENGTH_STANDARD = 20
+    _SCALPING_COOLDOWN = 5
+    _EXTREMA_WINDOW = 5
+    _TP_MULT = 1.5
+
+    def __init__(self,
                  min_wave_confidence: float = 0.7,
                  scalping_mode: bool = True,
                  wave_analysis_lookback: int = 50,
@@ -42,83 +78,204 @@ class ElliottWaveStrategy:
         self.enable_both_directions = enable_both_directions
         
         # Configurar TaewAnalyzer para scalping
-        min_wave_length = 10 if scalping_mode else 20
-        
+        min_wave_length = (self._MIN_WAVE_LENGTH_SCALPING if scalping_mode
+                           else self._MIN_WAVE_LENGTH_STANDARD)
+
         self.taew_analyzer = TaewAnalyzer(
             min_wave_length=min_wave_length,
             enable_both_directions=enable_both_directions
         )
         
-        # Cache para optimización
-        self.last_analysis_length = 0
+        # Cache LRU acotada señal-por-ventana, clave (longitud, último
+        # Close, último timestamp). La igualdad de longitudes sola daba
+        # falsos hits; un memo sin límite crecería una entrada por
+        # (símbolo, barra) en walk-forwards multi-símbolo largos.
+        # Capacidad fija: más grande -> mayor hit ratio; más pequeña ->
+        # menos memoria.
+        self._sig_cache = OrderedDict()
+        self._sig_cache_max = 256
+        self._cache_hits = 0
+        self._cache_misses = 0
         self.last_signal = 'HOLD'
         self.last_wave_signal = None
-        
-        # Configuración específica para scalping
-        if scalping_mode:
-            self.signal_cooldown = 5  # Evitar señales muy frecuentes
-            self.last_signal_bar = -999
+
+        # Extremos rodantes incrementales para las validaciones de scalping
+        self._extrema = RollingExtrema(self._EXTREMA_WINDOW)
+
+        # Multiplicador de proyección del take profit (rango de la vela ×
+        # _TP_MULT), constante de la estrategia
+        self._tp_mult = self._TP_MULT
+
+        # Niveles de swing del último análisis completo (short-circuit)
+        self._last_swing_high = None
+        self._last_swing_low = None
+        self._last_analyze_len = -999
+
+        # Warm-start del analyzer (ondas previas + contexto de la ventana)
+        self._last_waves_cache = None
+        self._last_end_len = -1
+        self._last_close = None
+
+        # Configuración específica para scalping (siempre presente para que
+        # update_parameters pueda activar el modo scalping a posteriori)
+        self.signal_cooldown = self._SCALPING_COOLDOWN  # Evitar señales muy frecuentes
+        self.last_signal_bar = -999
         
         # Compatibilidad con PortfolioManager existente
         # El PortfolioManager espera este atributo de las estrategias anteriores
         self.middle_band_col = None  # No usamos Bollinger Bands, pero mantenemos compatibilidad
-        
-        print(f"ElliottWaveStrategy inicializada:")
-        print(f"  - Modo scalping: {scalping_mode}")
-        print(f"  - Confianza mínima: {min_wave_confidence}")
-        print(f"  - Lookback: {wave_analysis_lookback} velas")
-        print(f"  - Direcciones: {'Ambas' if enable_both_directions else 'Solo LONG'}")
+
+        # Especialización en construcción: scalping_mode es constante tras el
+        # __init__, así que se liga la variante de check_signal con las ramas
+        # muertas ya eliminadas en vez de re-consultar el flag en cada barra.
+        # La presencia de Close_time se resuelve una vez en la primera barra.
+        self._has_close_time = None
+        self._check_signal_impl = (self._check_signal_scalping if scalping_mode
+                                   else self._check_signal_standard)
+
+        log.info(
+            "%s inicializada: scalping=%s, confianza=%s, "
+            "lookback=%s velas, direcciones=%s",
+            type(self).__name__, scalping_mode, min_wave_confidence,
+            wave_analysis_lookback,
+            'Ambas' if enable_both_directions else 'Solo LONG')
 
     def check_signal(self, df: pd.DataFrame) -> str:
         """
         Analiza el DataFrame y genera señales basadas en ondas de Elliott.
-        
+
+        Delegación a la variante especializada ligada en __init__ según
+        scalping_mode (_check_signal_scalping / _check_signal_standard).
+
         Args:
             df: DataFrame con datos OHLCV
-            
+
         Returns:
             str: Señal generada ('BUY', 'SELL', 'HOLD')
         """
+        return self._check_signal_impl(df)
+
+    def _check_signal_scalping(self, df: pd.DataFrame) -> str:
+        """Variante scalping de check_signal (cache + short-circuit)."""
         # Validaciones básicas
         if df.empty or len(df) < self.wave_analysis_lookback:
             return 'HOLD'
-        
+
         try:
-            # Optimización para scalping: usar solo datos recientes
-            if self.scalping_mode:
-                analysis_df = df.tail(self.wave_analysis_lookback).copy()
-            else:
-                analysis_df = df.copy()
-            
-            # Optimización: evitar recálculo si los datos no han cambiado significativamente
-            if len(analysis_df) == self.last_analysis_length and self.scalping_mode:
+            # Optimización para scalping: usar solo datos recientes.
+            # Vista sin copia: el análisis solo lee, nunca muta, así que el
+            # tail().copy() anterior duplicaba lookback filas × columnas
+            # (BlockManager + índice) en cada barra sin necesidad.
+            analysis_df = df.iloc[-self.wave_analysis_lookback:]
+
+            # Configurar índice temporal para el analyzer (sin mutar la
+            # vista). La presencia de columnas se resuelve UNA sola vez:
+            # un DataFrame mal formado falla aquí con un error claro en
+            # lugar de construir y tragar una KeyError por barra.
+            if self._has_close_time is None:
+                self._bind_columns(df)
+            if self._has_close_time:
+                analysis_df = analysis_df.set_index('Close_time')
+
+            # Optimización: si la ventana ya fue analizada (misma longitud,
+            # mismo último cierre y mismo timestamp final), la señal
+            # cacheada sigue siendo válida.
+            cache_key = (len(analysis_df),
+                         float(analysis_df['Close'].values[-1]),
+                         analysis_df.index[-1])
+            cached = self._sig_cache.get(cache_key)
+            if cached is not None:
+                self._sig_cache.move_to_end(cache_key)
+                self._cache_hits += 1
+                return cached
+
+            # Short-circuit de pivotes: las ondas solo pueden cambiar si el
+            # cierre rompe los extremos vigentes en el último análisis
+            # completo. Dentro del rango (y del cooldown) la señal previa
+            # sigue siendo válida y nos saltamos el TaewAnalyzer entero.
+            if self._last_swing_high is not None \
+                    and self._last_swing_low < cache_key[1] < self._last_swing_high \
+                    and len(df) - self._last_analyze_len < self.signal_cooldown:
                 return self.last_signal
-            
-            # Configurar índice temporal para el analyzer
-            if 'Close_time' in analysis_df.columns:
-                analysis_df.set_index('Close_time', inplace=True)
-            elif analysis_df.index.name != 'Close_time':
-                # Si no hay Close_time, usar el índice existente
-                pass
-            
-            # Ejecutar análisis de ondas
-            detected_waves = self.taew_analyzer.analyze_elliott_waves(
-                analysis_df, price_column='Close'
-            )
-            
-            # Generar señal basada en las ondas detectadas
-            signal = self._generate_trading_signal(detected_waves, analysis_df)
-            
-            # Actualizar cache
-            self.last_analysis_length = len(analysis_df)
-            self.last_signal = signal
-            
-            return signal
-            
-        except Exception as e:
-            print(f"Error en ElliottWaveStrategy.check_signal: {e}")
+
+            return self._analyze_and_signal(df, analysis_df, cache_key)
+
+        except Exception:
+            log.exception("Error en %s.check_signal", type(self).__name__)
             return 'HOLD'
 
+    def _check_signal_standard(self, df: pd.DataFrame) -> str:
+        """Variante no-scalping: sin recorte de ventana ni short-circuits."""
+        if df.empty or len(df) < self.wave_analysis_lookback:
+            return 'HOLD'
+
+        try:
+            analysis_df = df
+            if self._has_close_time is None:
+                self._bind_columns(df)
+            if self._has_close_time:
+                analysis_df = analysis_df.set_index('Close_time')
+
+            cache_key = (len(analysis_df),
+                         float(analysis_df['Close'].values[-1]),
+                         analysis_df.index[-1])
+            return self._analyze_and_signal(df, analysis_df, cache_key)
+
+        except Exception:
+            log.exception("Error en %s.check_signal", type(self).__name__)
+            return 'HOLD'
+
+    _REQUIRED_COLUMNS = ('Close', 'High', 'Low')
+
+    def _bind_columns(self, df: pd.DataFrame) -> None:
+        """
+        Verifica UNA vez (primera barra / tras reset_cache) que el DataFrame
+        trae las columnas requeridas y resuelve la presencia de Close_time.
+        """
+        missing = [c for c in self._REQUIRED_COLUMNS if c not in df.columns]
+        if missing:
+            raise KeyError(f"Faltan columnas requeridas para la estrategia: {missing}")
+        self._has_close_time = 'Close_time' in df.columns
+
+    def _analyze_and_signal(self, df: pd.DataFrame, analysis_df: pd.DataFrame,
+                            cache_key: tuple) -> str:
+        """Tramo común: análisis de ondas + señal + actualización de caches."""
+        # Ejecutar análisis de ondas con warm-start: si solo avanzó una
+        # barra y ésta prolonga el último tramo, el analyzer reutiliza
+        # el etiquetado previo en O(1).
+        warm = self._last_waves_cache if len(df) == self._last_end_len + 1 else None
+        detected_waves = self.taew_analyzer.analyze_elliott_waves_incremental(
+            analysis_df, price_column='Close',
+            warm_start=warm, prev_price=self._last_close
+        )
+        self._last_waves_cache = detected_waves
+        self._last_end_len = len(df)
+        self._last_close = cache_key[1]
+
+        # Generar señal basada en las ondas detectadas (hook por versión)
+        signal = self._signal_from_waves(detected_waves, analysis_df)
+
+        # Actualizar cache (evicción LRU) y niveles de swing del análisis
+        self._cache_misses += 1
+        self._sig_cache[cache_key] = signal
+        if len(self._sig_cache) > self._sig_cache_max:
+            self._sig_cache.popitem(last=False)
+        self.last_signal = signal
+        self._last_analyze_len = len(df)
+        self._extrema.update_from_frame(analysis_df)
+        self._last_swing_high = self._extrema.high
+        self._last_swing_low = self._extrema.low
+
+        return signal
+
+    def _signal_from_waves(self, detected_waves: List[Dict], df: pd.DataFrame) -> str:
+        """
+        Hook por versión: convierte las ondas detectadas en señal de trading.
+        V2 lo redefine para añadir la tendencia principal y la adaptación
+        direccional sin duplicar el resto del camino caliente.
+        """
+        return self._generate_trading_signal(detected_waves, df)
+
     def _generate_trading_signal(self, detected_waves: List[Dict], df: pd.DataFrame) -> str:
         """
         Genera señales de trading basadas en las ondas detectadas.
@@ -144,8 +301,9 @@ class ElliottWaveStrategy:
         if confidence < self.min_wave_confidence:
             return 'HOLD'
         
-        # Obtener acción sugerida
-        suggested_action = latest_signal_info.get('suggested_action', 'HOLD')
+        # Obtener acción sugerida como id (0=HOLD, 1=LONG, 2=SHORT)
+        action_id = latest_signal_info.get('suggested_action_id', 0)
+        suggested_action = WAVE_ACTIONS[action_id]
         
         # Filtros adicionales para scalping
         if self.scalping_mode:
@@ -158,8 +316,9 @@ class ElliottWaveStrategy:
             if not self._validate_scalping_conditions(df, suggested_action):
                 return 'HOLD'
         
-        # Convertir acción de Elliott Wave a señal de trading
-        trading_signal = self._convert_wave_action_to_signal(suggested_action)
+        # Convertir acción de Elliott Wave a señal de trading: indexado
+        # directo por id, sin hash de strings ni dict en el camino caliente
+        trading_signal = TRADING_SIGNALS[action_id]
         
         if trading_signal != 'HOLD':
             self.last_signal_bar = len(df) - 1
@@ -177,13 +336,9 @@ class ElliottWaveStrategy:
         Returns:
             str: Señal de trading ('BUY', 'SELL', 'HOLD')
         """
-        conversion_map = {
-            'CONSIDER_LONG': 'BUY',
-            'CONSIDER_SHORT': 'SELL',
-            'HOLD': 'HOLD'
-        }
-        
-        return conversion_map.get(wave_action, 'HOLD')
+        return TRADING_SIGNALS[self._ACTION_IDS.get(wave_action, 0)]
+
+    _ACTION_IDS = {'HOLD': 0, 'CONSIDER_LONG': 1, 'CONSIDER_SHORT': 2}
 
     def _validate_scalping_conditions(self, df: pd.DataFrame, action: str) -> bool:
         """
@@ -198,46 +353,47 @@ class ElliottWaveStrategy:
         """
         if len(df) < 5:
             return False
-        
-        try:
-            recent_data = df.tail(5)
-            
-            # Validar volatilidad mínima para scalping
-            price_range = recent_data['High'].max() - recent_data['Low'].min()
-            avg_price = recent_data['Close'].mean()
-            volatility = price_range / avg_price
-            
-            # Requerir volatilidad mínima del 0.5% para scalping
-            if volatility < 0.005:
-                return False
-            
-            # Validar volumen si está disponible
-            if 'Volume' in df.columns:
-                recent_volume = recent_data['Volume'].mean()
-                if recent_volume <= 0:
-                    return False
-            
-            # Validación direccional específica
-            if action == 'CONSIDER_SHORT':
-                # Para SHORT: verificar que el precio reciente esté alto
-                latest_close = recent_data['Close'].iloc[-1]
-                recent_high = recent_data['High'].max()
-                if latest_close < recent_high * 0.98:  # Al menos cerca del máximo reciente
-                    return False
-            
-            elif action == 'CONSIDER_LONG':
-                # Para LONG: verificar que el precio reciente esté bajo
-                latest_close = recent_data['Close'].iloc[-1]
-                recent_low = recent_data['Low'].min()
-                if latest_close > recent_low * 1.02:  # Al menos cerca del mínimo reciente
-                    return False
-            
-            return True
-            
-        except Exception as e:
-            print(f"Error validando condiciones de scalping: {e}")
+
+        # Sin try/except propio: las columnas requeridas ya se verificaron
+        # en _bind_columns y el try externo de check_signal cubre el resto,
+        # evitando construir objetos de excepción en el camino caliente.
+
+        # Extremos rodantes O(1): la cola monótona ya conoce el máximo y
+        # mínimo de las últimas 5 barras sin re-escanearlas con pandas.
+        self._extrema.update_from_frame(df)
+        recent_high = self._extrema.high
+        recent_low = self._extrema.low
+
+        closes = df['Close'].values[-5:]
+        latest_close = closes[-1]
+
+        # Validar volatilidad mínima para scalping
+        volatility = (recent_high - recent_low) / closes.mean()
+
+        # Requerir volatilidad mínima del 0.5% para scalping
+        if volatility < 0.005:
+            return False
+
+        # Validar volumen si está disponible: la media solo se usaba
+        # para comprobar > 0, así que basta con mirar la última barra
+        # (más barato y semánticamente más fuerte que una media positiva
+        # arrastrada por barras viejas).
+        if 'Volume' in df.columns and df['Volume'].values[-1] <= 0:
             return False
 
+        # Validación direccional específica
+        if action == 'CONSIDER_SHORT':
+            # Para SHORT: verificar que el precio reciente esté alto
+            if latest_close < recent_high * 0.98:  # Al menos cerca del máximo reciente
+                return False
+
+        elif action == 'CONSIDER_LONG':
+            # Para LONG: verificar que el precio reciente esté bajo
+            if latest_close > recent_low * 1.02:  # Al menos cerca del mínimo reciente
+                return False
+
+        return True
+
     def get_strategy_info(self) -> Dict:
         """
         Retorna información sobre el estado actual de la estrategia.
@@ -260,52 +416,64 @@ class ElliottWaveStrategy:
         Resetea el cache interno de la estrategia.
         Útil para reiniciar el análisis o cambiar de activo.
         """
-        self.last_analysis_length = 0
+        self._sig_cache.clear()
+        self._cache_hits = 0
+        self._cache_misses = 0
         self.last_signal = 'HOLD'
         self.last_wave_signal = None
         self.last_signal_bar = -999
-        self.taew_analyzer.last_processed_length = 0
-        self.taew_analyzer.cached_waves = []
-        
-        print("Cache de ElliottWaveStrategy reseteado")
+        self._extrema = RollingExtrema(self._EXTREMA_WINDOW)
+        self._last_swing_high = None
+        self._last_swing_low = None
+        self._last_analyze_len = -999
+        self._last_waves_cache = None
+        self._last_end_len = -1
+        self._last_close = None
+        self._has_close_time = None  # re-resolver al cambiar de activo
+        self.taew_analyzer.reset_cache()
+
+        log.debug("Cache de %s reseteado", type(self).__name__)
+
+    def cache_stats(self) -> Dict:
+        """Hits/misses de la cache de señales, para monitorización."""
+        return {
+            'hits': self._cache_hits,
+            'misses': self._cache_misses,
+            'size': len(self._sig_cache),
+            'maxsize': self._sig_cache_max
+        }
+
+    def take_profit_fast(self, high: float, low: float, close: float,
+                         sign: int) -> float:
+        """
+        Take profit sobre floats ya extraídos: aritmética pura sin ramas.
+
+        sign=+1 para LONG, -1 para SHORT, 0 deja el precio actual. Proyecta
+        el rango de la vela (_tp_mult veces) en la dirección del trade sin
+        tocar la Serie pandas — pensado para llamarse muchas veces por día
+        de backtest con los floats ya en mano.
+        """
+        return close + sign * (high - low) * self._tp_mult
 
     def get_take_profit_price(self, current_candle: pd.Series, direction: str) -> float:
         """
-        Calcula el precio de take profit para Elliott Wave basado en la estructura de ondas.
-        
+        Calcula el precio de take profit para Elliott Wave.
+
+        Shim de compatibilidad: extrae los tres floats de la vela UNA vez y
+        delega en take_profit_fast.
+
         Args:
             current_candle: Serie con datos de la vela actual
             direction: Dirección del trade ('LONG' o 'SHORT')
-            
+
         Returns:
             float: Precio de take profit calculado
         """
-        try:
-            # Para Elliott Wave, usamos un enfoque de projección de precio
-            # basado en la volatilidad reciente y la estructura de ondas
-            
-            current_price = current_candle['Close']
-            
-            # Usar High/Low reciente como referencia para proyecciones
-            if direction == 'LONG':
-                # Para LONG: objetivo es un nivel de resistencia proyectado
-                # Usar el rango reciente como guía
-                recent_range = current_candle.get('High', current_price) - current_candle.get('Low', current_price)
-                take_profit = current_price + (recent_range * 1.5)  # Proyección 1.5x el rango
-                
-            elif direction == 'SHORT':
-                # Para SHORT: objetivo es un nivel de soporte proyectado
-                recent_range = current_candle.get('High', current_price) - current_candle.get('Low', current_price)
-                take_profit = current_price - (recent_range * 1.5)  # Proyección 1.5x el rango
-                
-            else:
-                take_profit = current_price  # Fallback
-            
-            return take_profit
-            
-        except Exception as e:
-            print(f"Error calculando take profit Elliott Wave: {e}")
-            return current_candle['Close']  # Fallback al precio actual
+        close = float(current_candle['Close'])
+        high = float(current_candle.get('High', close))
+        low = float(current_candle.get('Low', close))
+        sign = 1 if direction == 'LONG' else -1 if direction == 'SHORT' else 0
+        return self.take_profit_fast(high, low, close, sign)
 
     def update_parameters(self, **kwargs):
         """
@@ -316,12 +484,15 @@ class ElliottWaveStrategy:
         """
         if 'min_wave_confidence' in kwargs:
             self.min_wave_confidence = kwargs['min_wave_confidence']
-            print(f"Confianza mínima actualizada a: {self.min_wave_confidence}")
-        
+            log.debug("Confianza mínima actualizada a: %s", self.min_wave_confidence)
+
         if 'wave_analysis_lookback' in kwargs:
             self.wave_analysis_lookback = kwargs['wave_analysis_lookback']
-            print(f"Lookback actualizado a: {self.wave_analysis_lookback}")
-        
+            log.debug("Lookback actualizado a: %s", self.wave_analysis_lookback)
+
         if 'scalping_mode' in kwargs:
             self.scalping_mode = kwargs['scalping_mode']
-            print(f"Modo scalping: {self.scalping_mode}")
\ No newline at end of file
+            # Re-ligar la variante especializada de check_signal
+            self._check_signal_impl = (self._check_signal_scalping if self.scalping_mode
+                                       else self._check_signal_standard)
+            log.debug("Modo scalping: %s", self.scalping_mode)
\ No newline at end of file
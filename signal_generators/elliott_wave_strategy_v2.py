@@ -4,15 +4,26 @@ ElliottWaveStrategy V2 - Versión Optimizada
 
 Estrategia mejorada que corrige el sesgo direccional y se adapta a diferentes
 condiciones de mercado usando filtros de tendencia inteligentes.
+
+V2 es una subclase de ElliottWaveStrategy: comparte los caminos calientes
+(check_signal especializado, caches LRU, warm-start del analyzer, take
+profit) y solo redefine la detección de tendencia, la señal adaptativa y
+los umbrales de validación. Cualquier optimización del camino caliente se
+implementa una sola vez en la base.
 """
 
+import logging
+
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional
-from analysis_engines.taew_analyzer import TaewAnalyzer
+from analysis_engines.taew_analyzer import TaewAnalyzer, WAVE_ACTIONS, TRADING_SIGNALS
+from signal_generators.elliott_wave_strategy import ElliottWaveStrategy
+
+log = logging.getLogger(__name__)
 
 
-class ElliottWaveStrategyV2:
+class ElliottWaveStrategyV2(ElliottWaveStrategy):
     """
     Estrategia Elliott Wave optimizada con:
     - Detección de tendencia principal
@@ -20,8 +31,20 @@ class ElliottWaveStrategyV2:
     - Filtros de calidad mejorados
     - Lógica bidireccional balanceada
     """
-    
-    def __init__(self, 
+
+    # Solo los atributos propios de V2; el resto vive en los slots de la base
+    __slots__ = ('trend_filter_enabled', 'trend_lookback',
+                 'adaptive_direction', 'last_trend_direction',
+                 '_adapt_table', '_trend_fn')
+
+    # Tunables que difieren de V1 (más permisivos para más señales)
+    _MIN_WAVE_LENGTH_SCALPING = 8
+    _MIN_WAVE_LENGTH_STANDARD = 15
+    _SCALPING_COOLDOWN = 3  # Reducido para más actividad
+    _EXTREMA_WINDOW = 10
+    _TP_MULT = 1.2  # Más conservador que V1 para mejor win rate
+
+    def __init__(self,
                  min_wave_confidence: float = 0.75,  # Reducido para más señales
                  scalping_mode: bool = True,
                  wave_analysis_lookback: int = 100,
@@ -30,7 +53,7 @@ class ElliottWaveStrategyV2:
                  adaptive_direction: bool = True):
         """
         Inicializa la estrategia Elliott Wave V2.
-        
+
         Args:
             min_wave_confidence: Confianza mínima (reducida para más señales)
             scalping_mode: Modo scalping optimizado
@@ -39,144 +62,141 @@ class ElliottWaveStrategyV2:
             trend_lookback: Período para determinar tendencia
             adaptive_direction: Adaptar dirección según tendencia
         """
-        self.min_wave_confidence = min_wave_confidence
-        self.scalping_mode = scalping_mode
-        self.wave_analysis_lookback = wave_analysis_lookback
         self.trend_filter_enabled = trend_filter_enabled
         self.trend_lookback = trend_lookback
         self.adaptive_direction = adaptive_direction
-        
-        # Configurar TaewAnalyzer
-        min_wave_length = 8 if scalping_mode else 15  # Más permisivo
-        
-        self.taew_analyzer = TaewAnalyzer(
-            min_wave_length=min_wave_length,
-            enable_both_directions=True  # Siempre bidireccional
-        )
-        
-        # Cache optimizado
-        self.last_analysis_length = 0
-        self.last_signal = 'HOLD'
         self.last_trend_direction = 'NEUTRAL'
-        self.last_wave_signal = None
-        
-        # Configuración de scalping mejorada
-        if scalping_mode:
-            self.signal_cooldown = 3  # Reducido para más actividad
-            self.last_signal_bar = -999
-        
-        # Compatibilidad con PortfolioManager
-        self.middle_band_col = None
-        
-        print(f"ElliottWaveStrategy V2 inicializada:")
-        print(f"  - Modo scalping: {scalping_mode}")
-        print(f"  - Confianza mínima: {min_wave_confidence}")
-        print(f"  - Filtro de tendencia: {trend_filter_enabled}")
-        print(f"  - Dirección adaptativa: {adaptive_direction}")
-        print(f"  - Lookback ondas: {wave_analysis_lookback}")
-
-    def check_signal(self, df: pd.DataFrame) -> str:
+
+        super().__init__(min_wave_confidence=min_wave_confidence,
+                         scalping_mode=scalping_mode,
+                         wave_analysis_lookback=wave_analysis_lookback,
+                         enable_both_directions=True)  # Siempre bidireccional
+
+        # Tabla (trend, acción base, dirección de onda) -> acción adaptada,
+        # construida una vez para sustituir el árbol if/elif de
+        # _adapt_signal_to_trend por un único indexado int8.
+        adapt = np.empty((3, 3, 2), dtype=np.int8)
+        for t in range(3):
+            for b in range(3):
+                adapt[t, b, :] = b  # por defecto, mantener la acción base
+        # BULLISH: final de onda alcista con señal SHORT -> invertir a LONG
+        adapt[1, 2, 0] = 1
+        # BEARISH: final de onda bajista con señal LONG -> invertir a SHORT
+        adapt[2, 1, 1] = 2
+        self._adapt_table = adapt
+
+        # Especialización en construcción: filtro de tendencia constante
+        # NEUTRAL cuando está desactivado
+        self._trend_fn = (self._determine_market_trend if trend_filter_enabled
+                          else lambda df: 'NEUTRAL')
+
+        log.info(
+            "ElliottWaveStrategy V2: filtro tendencia=%s, dirección "
+            "adaptativa=%s", trend_filter_enabled, adaptive_direction)
+
+    def check_signal_batch(self, df: pd.DataFrame) -> np.ndarray:
         """
-        Analiza el DataFrame y genera señales adaptativas basadas en Elliott Wave.
+        Modo batch/offline: precalcula las señales de TODO el histórico.
+
+        Ejecuta el análisis de ondas UNA sola vez sobre la serie completa,
+        marca la barra final de cada onda con su acción base y delega
+        tendencia, validaciones de scalping y cooldown al kernel compilado
+        (ver elliott_wave_kernel). Aproxima el modo streaming — que
+        re-analiza una ventana deslizante por barra — a cambio de una única
+        pasada O(N). check_signal sigue siendo la referencia en vivo.
+
+        Returns:
+            ndarray int8 alineado con df: 1=BUY, -1=SELL, 0=HOLD.
         """
-        if df.empty or len(df) < self.wave_analysis_lookback:
-            return 'HOLD'
-        
-        try:
-            # Preparar datos para análisis
-            analysis_df = df.tail(self.wave_analysis_lookback).copy() if self.scalping_mode else df.copy()
-            
-            # Optimización: evitar recálculo innecesario
-            if len(analysis_df) == self.last_analysis_length and self.scalping_mode:
-                return self.last_signal
-            
-            # Configurar índice temporal
-            if 'Close_time' in analysis_df.columns:
-                analysis_df.set_index('Close_time', inplace=True)
-            
-            # 1. Determinar tendencia principal
-            trend_direction = self._determine_market_trend(analysis_df)
-            
-            # 2. Ejecutar análisis de ondas Elliott
-            detected_waves = self.taew_analyzer.analyze_elliott_waves(
-                analysis_df, price_column='Close'
-            )
-            
-            # 3. Generar señal adaptativa
-            signal = self._generate_adaptive_signal(detected_waves, analysis_df, trend_direction)
-            
-            # Actualizar cache
-            self.last_analysis_length = len(analysis_df)
-            self.last_signal = signal
-            self.last_trend_direction = trend_direction
-            
-            return signal
-            
-        except Exception as e:
-            print(f"Error en ElliottWaveStrategy V2: {e}")
-            return 'HOLD'
+        from signal_generators.elliott_wave_kernel import batch_signals
+
+        n = len(df)
+        # float32: toda la aritmética del kernel (ratios de volatilidad,
+        # pendiente EMA, momentum) tolera esa precisión de sobra y la mitad
+        # de bytes movidos duplica el ancho de banda efectivo y los carriles
+        # SIMD. Los precios de TP devueltos al framework siguen en float64.
+        close = np.ascontiguousarray(df['Close'].to_numpy(dtype=np.float32))
+        high = np.ascontiguousarray(df['High'].to_numpy(dtype=np.float32))
+        low = np.ascontiguousarray(df['Low'].to_numpy(dtype=np.float32))
+
+        if 'EMA_21' in df.columns:
+            ema = df['EMA_21'].to_numpy(dtype=np.float32)
+        else:
+            ema = df['Close'].ewm(span=21).mean().to_numpy(dtype=np.float32)
+        ema = np.nan_to_num(ema)
+
+        # Acciones base: la barra donde termina cada onda completa recibe
+        # la misma acción que sugiere _determine_trading_action.
+        base_action = np.zeros(n, dtype=np.int8)
+        detected_waves = self.taew_analyzer.analyze_elliott_waves(df, price_column='Close')
+        for wave in detected_waves:
+            z_points = wave.get('z') or []
+            if not z_points or len(wave.get('x', [])) < 5:
+                continue
+            if wave.get('confidence', 0.0) < self.min_wave_confidence:
+                continue
+            end_idx = int(max(z_points))
+            if end_idx < n:
+                base_action[end_idx] = 1 if wave.get('direction') == 'DOWNWARD' else -1
+
+        cooldown = self.signal_cooldown if self.scalping_mode else 0
+        return batch_signals(close, high, low, ema, base_action,
+                             self.wave_analysis_lookback, cooldown)
+
+    def _signal_from_waves(self, detected_waves: List[Dict], df: pd.DataFrame) -> str:
+        """Camino V2: tendencia principal + señal adaptativa."""
+        trend_direction = self._trend_fn(df)
+        signal = self._generate_adaptive_signal(detected_waves, df, trend_direction)
+        self.last_trend_direction = trend_direction
+        return signal
 
     def _determine_market_trend(self, df: pd.DataFrame) -> str:
         """
         Determina la tendencia principal del mercado.
-        
+
         Returns:
             str: 'BULLISH', 'BEARISH', o 'NEUTRAL'
         """
         if not self.trend_filter_enabled or len(df) < self.trend_lookback:
             return 'NEUTRAL'
-        
-        try:
-            # Usar EMA_21 si está disponible, sino calcular
-            if 'EMA_21' in df.columns:
-                ema = df['EMA_21'].iloc[-self.trend_lookback:]
-            else:
-                ema = df['Close'].ewm(span=21).mean().iloc[-self.trend_lookback:]
-            
-            # Análisis de pendiente de EMA
-            ema_slope = (ema.iloc[-1] - ema.iloc[-10]) / ema.iloc[-10] if len(ema) >= 10 else 0
-            
-            # Posición del precio respecto a EMA
-            current_price = df['Close'].iloc[-1]
-            current_ema = ema.iloc[-1]
-            price_vs_ema = (current_price - current_ema) / current_ema
-            
-            # Análisis de momentum reciente
-            recent_prices = df['Close'].iloc[-10:]
-            price_momentum = (recent_prices.iloc[-1] - recent_prices.iloc[0]) / recent_prices.iloc[0]
-            
-            # Combinar señales para determinar tendencia
-            bullish_signals = 0
-            bearish_signals = 0
-            
-            # Señal 1: Pendiente EMA
-            if ema_slope > 0.01:  # 1% de pendiente alcista
-                bullish_signals += 1
-            elif ema_slope < -0.01:  # 1% de pendiente bajista
-                bearish_signals += 1
-            
-            # Señal 2: Precio vs EMA
-            if price_vs_ema > 0.005:  # Precio 0.5% por encima de EMA
-                bullish_signals += 1
-            elif price_vs_ema < -0.005:  # Precio 0.5% por debajo de EMA
-                bearish_signals += 1
-            
-            # Señal 3: Momentum de precio
-            if price_momentum > 0.02:  # 2% de momentum alcista
-                bullish_signals += 1
-            elif price_momentum < -0.02:  # 2% de momentum bajista
-                bearish_signals += 1
-            
-            # Determinar tendencia principal
-            if bullish_signals >= 2:
-                return 'BULLISH'
-            elif bearish_signals >= 2:
-                return 'BEARISH'
-            else:
-                return 'NEUTRAL'
-                
-        except Exception as e:
-            print(f"Error determinando tendencia: {e}")
+
+        # Sin try/except propio: las columnas requeridas ya se verificaron
+        # en _bind_columns y el try externo de check_signal cubre el resto.
+
+        # Un solo volcado a ndarray por columna: solo hacen falta dos
+        # puntos de la EMA y dos del precio, así que las Series
+        # intermedias (.iloc sobre slices pandas) eran puro overhead.
+        closes = df['Close'].to_numpy()
+
+        # Usar EMA_21 si está disponible, sino calcular una vez
+        if 'EMA_21' in df.columns:
+            ema_vals = df['EMA_21'].to_numpy()
+        else:
+            ema_vals = df['Close'].ewm(span=21).mean().to_numpy()
+
+        current_ema = ema_vals[-1]
+        ema_lag = ema_vals[-10] if ema_vals.size >= 10 else ema_vals[0]
+
+        # Señal 1: pendiente EMA / Señal 2: precio vs EMA /
+        # Señal 3: momentum de precio — aritmética escalar sobre floats
+        ema_slope = (current_ema - ema_lag) / ema_lag if ema_lag else 0.0
+        price_vs_ema = (closes[-1] - current_ema) / current_ema if current_ema else 0.0
+        price_momentum = (closes[-1] - closes[-10]) / closes[-10] if closes[-10] else 0.0
+
+        # Conteo sin ramas: cada comparación se suma como entero. El int()
+        # explícito importa: los escalares aquí son np.float64 y la suma de
+        # np.bool_ es OR lógico (satura en True), no un conteo.
+        bullish_signals = int(ema_slope > 0.01) + int(price_vs_ema > 0.005) \
+            + int(price_momentum > 0.02)
+        bearish_signals = int(ema_slope < -0.01) + int(price_vs_ema < -0.005) \
+            + int(price_momentum < -0.02)
+
+        # Determinar tendencia principal
+        if bullish_signals >= 2:
+            return 'BULLISH'
+        elif bearish_signals >= 2:
+            return 'BEARISH'
+        else:
             return 'NEUTRAL'
 
     def _generate_adaptive_signal(self, detected_waves: List[Dict], df: pd.DataFrame, trend: str) -> str:
@@ -185,71 +205,60 @@ class ElliottWaveStrategyV2:
         """
         if not detected_waves:
             return 'HOLD'
-        
+
         # Obtener señal base de Elliott Wave
         latest_signal_info = self.taew_analyzer.get_latest_wave_signal(detected_waves)
-        
+
         if not latest_signal_info:
             return 'HOLD'
-        
+
         # Verificar confianza mínima
         confidence = latest_signal_info.get('confidence', 0.0)
         if confidence < self.min_wave_confidence:
             return 'HOLD'
-        
+
         base_action = latest_signal_info.get('suggested_action', 'HOLD')
-        
+
         # NUEVA LÓGICA ADAPTATIVA
         if self.adaptive_direction and trend != 'NEUTRAL':
             adapted_signal = self._adapt_signal_to_trend(base_action, trend, detected_waves[-1])
         else:
             # Lógica tradicional mejorada
             adapted_signal = self._improve_traditional_logic(base_action, detected_waves, df)
-        
+
         # Filtros de scalping
         if self.scalping_mode:
             if not self._validate_scalping_conditions_v2(df, adapted_signal):
                 return 'HOLD'
-            
+
             # Cooldown entre señales
             current_bar = len(df) - 1
             if current_bar - self.last_signal_bar < self.signal_cooldown:
                 return 'HOLD'
-        
+
         # Convertir a señal de trading
         trading_signal = self._convert_action_to_signal(adapted_signal)
-        
+
         if trading_signal != 'HOLD':
             self.last_signal_bar = len(df) - 1
             self.last_wave_signal = latest_signal_info
-        
+
         return trading_signal
 
+    _TREND_IDS = {'NEUTRAL': 0, 'BULLISH': 1, 'BEARISH': 2}
+
     def _adapt_signal_to_trend(self, base_action: str, trend: str, latest_wave: Dict) -> str:
         """
         Adapta la señal de Elliott Wave según la tendencia principal.
+
+        La lógica de inversión inteligente (aprovechar correcciones en
+        tendencias fuertes) está codificada en la tabla _adapt_table; aquí
+        solo se indexan los tres ids.
         """
-        wave_direction = latest_wave.get('direction', '')
-        
-        # NUEVA LÓGICA: Aprovechar correcciones en tendencias fuertes
-        if trend == 'BULLISH':
-            # En tendencia alcista, buscar oportunidades LONG
-            if base_action == 'CONSIDER_SHORT' and wave_direction == 'UPWARD':
-                # Final de onda alcista en tendencia alcista = posible corrección = oportunidad LONG
-                return 'CONSIDER_LONG'  # INVERSIÓN INTELIGENTE
-            elif base_action == 'CONSIDER_LONG':
-                return 'CONSIDER_LONG'  # Mantener señales LONG
-            
-        elif trend == 'BEARISH':
-            # En tendencia bajista, buscar oportunidades SHORT
-            if base_action == 'CONSIDER_LONG' and wave_direction == 'DOWNWARD':
-                # Final de onda bajista en tendencia bajista = posible rebote = oportunidad SHORT
-                return 'CONSIDER_SHORT'  # INVERSIÓN INTELIGENTE
-            elif base_action == 'CONSIDER_SHORT':
-                return 'CONSIDER_SHORT'  # Mantener señales SHORT
-        
-        # Si no hay adaptación clara, usar lógica mejorada
-        return base_action
+        wave_dir = 1 if latest_wave.get('direction', '') == 'DOWNWARD' else 0
+        trend_id = self._TREND_IDS.get(trend, 0)
+        base_id = self._ACTION_IDS.get(base_action, 0)
+        return WAVE_ACTIONS[self._adapt_table[trend_id, base_id, wave_dir]]
 
     def _improve_traditional_logic(self, base_action: str, detected_waves: List[Dict], df: pd.DataFrame) -> str:
         """
@@ -257,26 +266,27 @@ class ElliottWaveStrategyV2:
         """
         if not detected_waves:
             return base_action
-        
+
         latest_wave = detected_waves[-1]
         wave_direction = latest_wave.get('direction', '')
         wave_points = len(latest_wave.get('x', []))
-        
+
         # NUEVA LÓGICA: Buscar finales de ondas correctivas para entradas
         if wave_direction == 'DOWNWARD' and wave_points >= 5:
             # Final de onda bajista completa = oportunidad LONG
             return 'CONSIDER_LONG'
         elif wave_direction == 'UPWARD' and wave_points >= 5:
             # Mantener lógica SHORT para ondas alcistas completas, pero con filtros
-            current_price = df['Close'].iloc[-1]
-            recent_high = df['High'].tail(10).max()
-            
+            current_price = df['Close'].values[-1]
+            self._extrema.update_from_frame(df)
+            recent_high = self._extrema.high
+
             # Solo SHORT si estamos cerca de máximos recientes
             if current_price >= recent_high * 0.99:
                 return 'CONSIDER_SHORT'
             else:
                 return 'HOLD'  # No operar si no estamos en zona de resistencia
-        
+
         return base_action
 
     def _validate_scalping_conditions_v2(self, df: pd.DataFrame, action: str) -> bool:
@@ -285,80 +295,49 @@ class ElliottWaveStrategyV2:
         """
         if len(df) < 5:
             return False
-        
-        try:
-            recent_data = df.tail(10)  # Más datos para mejor análisis
-            
-            # 1. Volatilidad mínima (reducida para más señales)
-            price_range = recent_data['High'].max() - recent_data['Low'].min()
-            avg_price = recent_data['Close'].mean()
-            volatility = price_range / avg_price
-            
-            if volatility < 0.003:  # Reducido de 0.5% a 0.3%
-                return False
-            
-            # 2. Validación direccional mejorada
-            latest_close = recent_data['Close'].iloc[-1]
-            
-            if action == 'CONSIDER_LONG':
-                # Para LONG: verificar que no estemos en máximos extremos
-                recent_high = recent_data['High'].max()
-                if latest_close > recent_high * 0.98:  # Muy cerca del máximo
-                    return False
-                    
-            elif action == 'CONSIDER_SHORT':
-                # Para SHORT: verificar que estemos en zona alta
-                recent_low = recent_data['Low'].min()
-                if latest_close < recent_low * 1.02:  # Muy cerca del mínimo
-                    return False
-            
-            # 3. RSI para evitar extremos (si disponible)
-            if 'RSI_14' in df.columns:
-                current_rsi = recent_data['RSI_14'].iloc[-1]
-                if action == 'CONSIDER_LONG' and current_rsi > 75:  # Muy sobrecomprado
-                    return False
-                elif action == 'CONSIDER_SHORT' and current_rsi < 25:  # Muy sobrevendido
-                    return False
-            
-            return True
-            
-        except Exception as e:
-            print(f"Error en validación scalping V2: {e}")
+
+        # Sin try/except propio: las columnas requeridas ya se verificaron
+        # en _bind_columns y el try externo de check_signal cubre el resto.
+
+        # Extremos rodantes O(1): la cola monótona ya conoce el máximo y
+        # mínimo de las últimas 10 barras sin re-escanearlas con pandas.
+        self._extrema.update_from_frame(df)
+        recent_high = self._extrema.high
+        recent_low = self._extrema.low
+
+        closes = df['Close'].values[-10:]
+        latest_close = closes[-1]
+
+        # 1. Volatilidad mínima (reducida para más señales)
+        volatility = (recent_high - recent_low) / closes.mean()
+
+        if volatility < 0.003:  # Reducido de 0.5% a 0.3%
             return False
 
+        # 2. Validación direccional mejorada
+        if action == 'CONSIDER_LONG':
+            # Para LONG: verificar que no estemos en máximos extremos
+            if latest_close > recent_high * 0.98:  # Muy cerca del máximo
+                return False
+
+        elif action == 'CONSIDER_SHORT':
+            # Para SHORT: verificar que estemos en zona alta
+            if latest_close < recent_low * 1.02:  # Muy cerca del mínimo
+                return False
+
+        # 3. RSI para evitar extremos (si disponible)
+        if 'RSI_14' in df.columns:
+            current_rsi = df['RSI_14'].values[-1]
+            if action == 'CONSIDER_LONG' and current_rsi > 75:  # Muy sobrecomprado
+                return False
+            elif action == 'CONSIDER_SHORT' and current_rsi < 25:  # Muy sobrevendido
+                return False
+
+        return True
+
     def _convert_action_to_signal(self, action: str) -> str:
         """Convierte acción Elliott Wave a señal de trading."""
-        conversion_map = {
-            'CONSIDER_LONG': 'BUY',
-            'CONSIDER_SHORT': 'SELL',
-            'HOLD': 'HOLD'
-        }
-        return conversion_map.get(action, 'HOLD')
-
-    def get_take_profit_price(self, current_candle: pd.Series, direction: str) -> float:
-        """
-        Calcula take profit optimizado para Elliott Wave V2.
-        """
-        try:
-            current_price = current_candle['Close']
-            
-            # Take profit más conservador para mejor win rate
-            if direction == 'LONG':
-                recent_range = current_candle.get('High', current_price) - current_candle.get('Low', current_price)
-                take_profit = current_price + (recent_range * 1.2)  # Reducido de 1.5x a 1.2x
-                
-            elif direction == 'SHORT':
-                recent_range = current_candle.get('High', current_price) - current_candle.get('Low', current_price)
-                take_profit = current_price - (recent_range * 1.2)  # Reducido de 1.5x a 1.2x
-                
-            else:
-                take_profit = current_price
-            
-            return take_profit
-            
-        except Exception as e:
-            print(f"Error calculando take profit V2: {e}")
-            return current_candle['Close']
+        return TRADING_SIGNALS[self._ACTION_IDS.get(action, 0)]
 
     def get_strategy_info(self) -> Dict:
         """Información del estado de la estrategia V2."""
@@ -376,18 +355,20 @@ class ElliottWaveStrategyV2:
 
     def reset_cache(self):
         """Resetea cache de la estrategia V2."""
-        self.last_analysis_length = 0
-        self.last_signal = 'HOLD'
+        super().reset_cache()
         self.last_trend_direction = 'NEUTRAL'
-        self.last_wave_signal = None
-        self.last_signal_bar = -999
-        self.taew_analyzer.last_processed_length = 0
-        self.taew_analyzer.cached_waves = []
-        print("Cache de ElliottWaveStrategy V2 reseteado")
 
     def update_parameters(self, **kwargs):
         """Actualiza parámetros dinámicamente."""
         for param, value in kwargs.items():
             if hasattr(self, param):
                 setattr(self, param, value)
-                print(f"Parámetro {param} actualizado a: {value}")
\ No newline at end of file
+                log.debug("Parámetro %s actualizado a: %s", param, value)
+
+        # Re-ligar las variantes especializadas si cambió algún flag
+        if 'scalping_mode' in kwargs:
+            self._check_signal_impl = (self._check_signal_scalping if self.scalping_mode
+                                       else self._check_signal_standard)
+        if 'trend_filter_enabled' in kwargs:
+            self._trend_fn = (self._determine_market_trend
+                              if self.trend_filter_enabled else lambda df: 'NEUTRAL')
@@ -0,0 +1,28 @@
+# signal_generators/signal_strategy.py
+"""
+Interfaz común de precomputación vectorizada de señales.
+
+El backtester invoca check_signal una vez por barra — despacho Python O(N)
+inherente. Las estrategias que puedan calcular todo su vector de señales de
+una pasada (NumPy/numba) exponen precompute_signals(df); el backtester lo
+llama una única vez antes de la simulación y cada check_signal posterior se
+reduce a indexar un int8. Las estrategias sin implementación vectorial
+(p. ej. las de ondas de Elliott) simplemente no lo definen y conservan el
+modo escalar.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class SignalStrategy:
+    """
+    Clase base opcional para estrategias con señales precomputables.
+
+    Contrato: precompute_signals(df) devuelve un ndarray int8 alineado con
+    df (1=BUY, -1=SELL, 0=HOLD) y deja a la estrategia lista para resolver
+    check_signal por lectura directa del vector.
+    """
+
+    def precompute_signals(self, df: pd.DataFrame) -> np.ndarray:
+        raise NotImplementedError
@@ -6,6 +6,13 @@ Valida la robustez de la estrategia probándola en un activo con tendencia bajis
 en lugar del rally alcista de DOGE.
 """
 
+import os
+import sys
+import concurrent.futures
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -14,38 +21,114 @@ from data_collectors.historical_data import get_extended_historical_klines
 from indicators.indicator_manager import IndicatorManager
 from signal_generators.elliott_wave_strategy_v2 import ElliottWaveStrategyV2
 from risk_management.risk_assessor import RiskAssessor
-from portfolio.portfolio_manager import PortfolioManager
+from portfolio.portfolio_manager import PortfolioManager, TradeRecord
 from backtesting.backtester import Backtester
 from backtesting.performance_analyzer import PerformanceAnalyzer
+from signal_generators._trend_kernels import _score_trend
+
+# Strings internados del despacho acción -> señal: comparar por identidad
+# (`is`) evita el hash + .get del diccionario en cada barra. Los literales
+# que produce el taew_analyzer son constantes de módulo, así que la
+# identidad coincide en el caso común.
+_CONSIDER_LONG = sys.intern('CONSIDER_LONG')
+_CONSIDER_SHORT = sys.intern('CONSIDER_SHORT')
+_BUY = sys.intern('BUY')
+_SELL = sys.intern('SELL')
+_HOLD = sys.intern('HOLD')
+
+# Tabla de adaptación (tendencia, acción base) -> acción adaptada: en
+# tendencia definida la estrategia robusta fuerza la dirección de la
+# tendencia; para NEUTRAL (o claves desconocidas) el .get devuelve la
+# acción base sin tocar. Un lookup de diccionario construido una vez
+# sustituye la cascada de if/elif por barra.
+_ADAPT = {
+    ('BULLISH', _CONSIDER_LONG): _CONSIDER_LONG,
+    ('BULLISH', _CONSIDER_SHORT): _CONSIDER_LONG,
+    ('BULLISH', _HOLD): _CONSIDER_LONG,
+    ('BEARISH', _CONSIDER_LONG): _CONSIDER_SHORT,
+    ('BEARISH', _CONSIDER_SHORT): _CONSIDER_SHORT,
+    ('BEARISH', _HOLD): _CONSIDER_SHORT,
+}
 
 
 class ElliottWaveStrategyRobust(ElliottWaveStrategyV2):
     """
-    Versión robusta de la estrategia que debe funcionar tanto en 
+    Versión robusta de la estrategia que debe funcionar tanto en
     mercados alcistas como bajistas.
     """
-    
+
+    # Verificación del índice hecha una sola vez en la primera barra
+    _index_ok = False
+
+    # Memos de tamaño 1 (clave, resultado): el Backtester puede consultar
+    # la estrategia más de una vez dentro de la misma vela (señal + riesgo)
+    # y el re-escaneo de hasta 100 cierres es puro trabajo repetido.
+    _trend_cache = None
+    _validate_cache = None
+
+    # Buffers de precios append-only: el Backtester extiende el DataFrame
+    # por el final, así que basta copiar las filas recién llegadas en lugar
+    # de volcar cada columna completa en cada barra. Arrays contiguos que
+    # mejoran la localidad de cache del kernel numba aguas abajo.
+    _close_buf = None
+    _high_buf = None
+    _low_buf = None
+    _buf_len = 0
+
+    # Memo de tamaño 1 para el análisis de ondas: dentro de la misma vela
+    # la clave (longitud, último Close/High/Low) no cambia, así que las
+    # consultas repetidas del Backtester reutilizan las ondas ya detectadas.
+    _wave_memo = None
+
+    def __init__(self, *args, verbose: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        # En un backtest de 10k barras los prints de diagnóstico por barra
+        # (formateo f-string + flush síncrono a stdout) dominan el wall
+        # clock una vez que los kernels numéricos son rápidos.
+        self.verbose = verbose
+
     def check_signal(self, df: pd.DataFrame) -> str:
         """
         Método principal sin cache para máxima adaptabilidad.
         """
         if df.empty or len(df) < self.wave_analysis_lookback:
             return 'HOLD'
-        
+
+        self._sync_price_buffers(df)
+
         try:
-            # Sin cache - siempre recalcular
-            analysis_df = df.tail(self.wave_analysis_lookback).copy() if self.scalping_mode else df.copy()
-            
-            if 'Close_time' in analysis_df.columns:
-                analysis_df.set_index('Close_time', inplace=True)
-            
+            # Sin cache - siempre recalcular. Vista sin copia: el análisis
+            # solo lee, así que el tail().copy() (o el df.copy() completo en
+            # modo no-scalping) duplicaba memoria en cada barra sin motivo.
+            analysis_df = df.iloc[-self.wave_analysis_lookback:] if self.scalping_mode else df
+
+            # Sin set_index por barra: run_bearish_test ya indexa el
+            # histórico por Close_time una única vez antes del backtest, y
+            # reconstruir el índice aquí en cada vela invalidaba el motor
+            # de etiquetas de pandas. Solo se verifica el contrato del
+            # caller en la primera llamada.
+            if not self._index_ok:
+                self._verify_indexed(df)
+                self._index_ok = True
+
             # Determinar tendencia
             trend_direction = self._determine_market_trend_robust(analysis_df)
             
-            # Análisis de ondas Elliott
-            detected_waves = self.taew_analyzer.analyze_elliott_waves(
-                analysis_df, price_column='Close'
+            # Análisis de ondas Elliott, con memo por barra: misma longitud
+            # y misma última vela implican la misma ventana de análisis.
+            wave_key = (
+                len(df),
+                float(self._close_buf[self._buf_len - 1]),
+                float(self._high_buf[self._buf_len - 1]),
+                float(self._low_buf[self._buf_len - 1]),
             )
+            if self._wave_memo is not None and self._wave_memo[0] == wave_key:
+                detected_waves = self._wave_memo[1]
+            else:
+                detected_waves = self.taew_analyzer.analyze_elliott_waves(
+                    analysis_df, price_column='Close'
+                )
+                self._wave_memo = (wave_key, detected_waves)
             
             # Generar señal adaptativa
             signal = self._generate_adaptive_signal_robust(detected_waves, analysis_df, trend_direction)
@@ -56,6 +139,49 @@ class ElliottWaveStrategyRobust(ElliottWaveStrategyV2):
             print(f"Error en estrategia robusta: {e}")
             return 'HOLD'
     
+    @staticmethod
+    def _verify_indexed(df: pd.DataFrame) -> None:
+        """
+        Comprueba (una sola vez) que el caller ya indexó los datos por
+        Close_time; si la columna sigue presente, el contrato se rompió.
+        """
+        assert 'Close_time' not in df.columns or df.index.name == 'Close_time', (
+            "Se esperaba el DataFrame ya indexado por Close_time "
+            "(ver run_bearish_test); el reindexado por barra fue eliminado."
+        )
+
+    def _sync_price_buffers(self, df: pd.DataFrame) -> None:
+        """
+        Mantiene copias contiguas de Close/High/Low copiando solo las filas
+        nuevas de la cola. Los buffers se preasignan con capacidad de sobra
+        y crecen geométricamente, escribiendo las filas nuevas in-place:
+        concatenar por barra reasignaba y copiaba el buffer completo cada
+        vez (O(n²) sobre el backtest). Si el DataFrame encoge (reinicio o
+        frame distinto) se reconstruyen desde cero.
+        """
+        n = len(df)
+        if self._close_buf is None or n < self._buf_len:
+            cap = max(256, 2 * n)
+            self._close_buf = np.empty(cap, dtype=np.float64)
+            self._high_buf = np.empty(cap, dtype=np.float64)
+            self._low_buf = np.empty(cap, dtype=np.float64)
+            self._close_buf[:n] = df['Close'].to_numpy(dtype=np.float64)
+            self._high_buf[:n] = df['High'].to_numpy(dtype=np.float64)
+            self._low_buf[:n] = df['Low'].to_numpy(dtype=np.float64)
+        elif n > self._buf_len:
+            if n > self._close_buf.size:
+                # Duplicar la capacidad amortiza la copia a O(1) por barra
+                cap = max(2 * self._close_buf.size, n)
+                for name in ('_close_buf', '_high_buf', '_low_buf'):
+                    grown = np.empty(cap, dtype=np.float64)
+                    grown[:self._buf_len] = getattr(self, name)[:self._buf_len]
+                    setattr(self, name, grown)
+            m = self._buf_len
+            self._close_buf[m:n] = df['Close'].values[m:n]
+            self._high_buf[m:n] = df['High'].values[m:n]
+            self._low_buf[m:n] = df['Low'].values[m:n]
+        self._buf_len = n
+
     def _determine_market_trend_robust(self, df: pd.DataFrame) -> str:
         """
         Detección de tendencia robusta para cualquier tipo de mercado.
@@ -63,66 +189,49 @@ class ElliottWaveStrategyRobust(ElliottWaveStrategyV2):
         try:
             if len(df) < 50:
                 return 'NEUTRAL'
-            
-            current_price = df['Close'].iloc[-1]
-            
-            # Análisis de múltiples períodos
-            bullish_signals = 0
-            bearish_signals = 0
-            
-            # Test períodos: 20, 50, 100 velas
-            for lookback in [20, 50, 100]:
-                if len(df) >= lookback:
-                    past_price = df['Close'].iloc[-lookback]
-                    change_pct = ((current_price / past_price) - 1) * 100
-                    
-                    # Umbrales adaptativos
-                    if change_pct > 5:  # Tendencia alcista fuerte
-                        bullish_signals += 2
-                    elif change_pct > 1:  # Tendencia alcista débil
-                        bullish_signals += 1
-                    elif change_pct < -5:  # Tendencia bajista fuerte
-                        bearish_signals += 2
-                    elif change_pct < -1:  # Tendencia bajista débil
-                        bearish_signals += 1
-            
-            # Análisis de momentum reciente
-            recent_20 = df['Close'].tail(20)
-            if len(recent_20) >= 10:
-                recent_change = ((recent_20.iloc[-1] / recent_20.iloc[0]) - 1) * 100
-                
-                if recent_change > 2:
-                    bullish_signals += 1
-                elif recent_change < -2:
-                    bearish_signals += 1
-            
-            # Análisis de posición en rango
-            recent_50 = df.tail(50)
-            if len(recent_50) >= 20:
-                high_50 = recent_50['High'].max()
-                low_50 = recent_50['Low'].min()
-                
-                if high_50 != low_50:
-                    position = (current_price - low_50) / (high_50 - low_50)
-                    
-                    if position > 0.7:  # Zona alta
-                        bullish_signals += 1
-                    elif position < 0.3:  # Zona baja
-                        bearish_signals += 1
+
+            # Vistas sobre los buffers contiguos sincronizados en
+            # check_signal (las últimas n filas del buffer son exactamente
+            # las n filas de la ventana de análisis); el volcado a ndarray
+            # solo se hace como fallback si se nos llama fuera de ese flujo.
+            n = len(df)
+            if self._buf_len >= n:
+                close = self._close_buf[self._buf_len - n:self._buf_len]
+                high = self._high_buf[self._buf_len - n:self._buf_len]
+                low = self._low_buf[self._buf_len - n:self._buf_len]
+            else:
+                close = df['Close'].to_numpy(copy=False)
+                high = df['High'].to_numpy(copy=False)
+                low = df['Low'].to_numpy(copy=False)
+            current_price = close[-1]
+
+            # Memo por barra: misma longitud y mismos dos últimos cierres
+            # implican la misma ventana y por tanto la misma tendencia.
+            cache_key = (close.size, float(close[-1]), float(close[-2]))
+            if self._trend_cache is not None and self._trend_cache[0] == cache_key:
+                return self._trend_cache[1]
+
+            # Scoring completo (lookbacks 20/50/100 + momentum + posición
+            # en rango) en el kernel compilado: una llamada por barra sobre
+            # los ndarrays crudos en lugar de despachar cada comparación en
+            # el intérprete.
+            bullish_signals, bearish_signals = _score_trend(close, high, low)
             
             # Decisión final balanceada
             net_signal = bullish_signals - bearish_signals
-            
+
             if net_signal >= 2:
                 trend = 'BULLISH'
-                print(f"🟢 TENDENCIA: BULLISH (señales: +{bullish_signals}, -{bearish_signals})")
             elif net_signal <= -2:
                 trend = 'BEARISH'
-                print(f"🔴 TENDENCIA: BEARISH (señales: +{bullish_signals}, -{bearish_signals})")
             else:
                 trend = 'NEUTRAL'
-                print(f"⚪ TENDENCIA: NEUTRAL (señales: +{bullish_signals}, -{bearish_signals})")
-            
+
+            if self.verbose:
+                marker = {'BULLISH': '🟢', 'BEARISH': '🔴', 'NEUTRAL': '⚪'}[trend]
+                print(f"{marker} TENDENCIA: {trend} (señales: +{bullish_signals}, -{bearish_signals})")
+
+            self._trend_cache = (cache_key, trend)
             return trend
             
         except Exception as e:
@@ -148,39 +257,27 @@ class ElliottWaveStrategyRobust(ElliottWaveStrategyV2):
             return 'HOLD'
         
         base_action = latest_signal_info.get('suggested_action', 'HOLD')
-        
-        print(f"🔄 ADAPTACIÓN ROBUSTA: {base_action} + Tendencia {trend_direction}")
-        
-        # Lógica adaptativa balanceada
-        if trend_direction == 'BULLISH':
-            # En mercado alcista: priorizar LONG
-            if base_action == 'CONSIDER_SHORT':
-                print(f"   🔄 CONVERSIÓN BULLISH: SHORT → LONG")
-                adapted_signal = 'CONSIDER_LONG'
-            else:
-                adapted_signal = 'CONSIDER_LONG'
-                
-        elif trend_direction == 'BEARISH':
-            # En mercado bajista: priorizar SHORT
-            if base_action == 'CONSIDER_LONG':
-                print(f"   🔄 CONVERSIÓN BEARISH: LONG → SHORT")
-                adapted_signal = 'CONSIDER_SHORT'
-            else:
-                adapted_signal = 'CONSIDER_SHORT'
-                
-        else:  # NEUTRAL
-            # En mercado neutral: usar señal original de Elliott Wave
-            adapted_signal = base_action
-        
+
+        if self.verbose:
+            print(f"🔄 ADAPTACIÓN ROBUSTA: {base_action} + Tendencia {trend_direction}")
+
+        # Lógica adaptativa balanceada vía tabla: alcista prioriza LONG,
+        # bajista prioriza SHORT, neutral respeta la señal de Elliott Wave.
+        adapted_signal = _ADAPT.get((trend_direction, base_action), base_action)
+
+        if self.verbose and adapted_signal != base_action:
+            print(f"   🔄 CONVERSIÓN {trend_direction}: {base_action} → {adapted_signal}")
+
         # Validaciones ultra-permisivas
         if self.scalping_mode:
             if not self._validate_minimal(df, adapted_signal):
                 return 'HOLD'
-        
+
         # Convertir a señal final
         final_signal = self._convert_action_to_signal(adapted_signal)
-        print(f"   📋 SEÑAL ROBUSTA: {final_signal}")
-        
+        if self.verbose:
+            print(f"   📋 SEÑAL ROBUSTA: {final_signal}")
+
         return final_signal
     
     def _validate_minimal(self, df: pd.DataFrame, action: str) -> bool:
@@ -189,33 +286,52 @@ class ElliottWaveStrategyRobust(ElliottWaveStrategyV2):
         """
         if len(df) < 3:
             return False
-        
+
         try:
-            # Solo verificar volatilidad ultra-mínima
-            recent_data = df.tail(5)
-            price_range = recent_data['High'].max() - recent_data['Low'].min()
-            avg_price = recent_data['Close'].mean()
-            
+            # Memo por barra: el resultado solo depende de la ventana
+            cache_key = (len(df), float(df['Close'].values[-1]))
+            if self._validate_cache is not None and self._validate_cache[0] == cache_key:
+                return self._validate_cache[1]
+
+            # Solo verificar volatilidad ultra-mínima. Vistas NumPy directas
+            # sobre las últimas 5 barras: tres reducciones sobre memoria
+            # cruda en lugar de construir un tail(5) y tres Series
+            # intermedias por llamada.
+            h = df['High'].values[-5:]
+            l = df['Low'].values[-5:]
+            c = df['Close'].values[-5:]
+            price_range = h.max() - l.min()
+            avg_price = c.mean()
+
             if avg_price == 0:
                 return False
-                
+
             volatility = price_range / avg_price
-            
+
             # Volatilidad mínima: 0.005% (casi cualquier mercado pasa)
-            return volatility >= 0.00005
-            
+            result = volatility >= 0.00005
+            self._validate_cache = (cache_key, result)
+            return result
+
         except Exception as e:
             print(f"Error en validación mínima: {e}")
             return True  # En caso de error, permitir
     
     def _convert_action_to_signal(self, action: str) -> str:
-        """Convierte acción a señal de trading."""
-        conversion_map = {
-            'CONSIDER_LONG': 'BUY',
-            'CONSIDER_SHORT': 'SELL',
-            'HOLD': 'HOLD'
-        }
-        return conversion_map.get(action, 'HOLD')
+        """Convierte acción a señal (identidad sobre strings internados)."""
+        if action is _CONSIDER_LONG:
+            return _BUY
+        if action is _CONSIDER_SHORT:
+            return _SELL
+        if action is _HOLD:
+            return _HOLD
+        # String construido dinámicamente: internar y reintentar una vez
+        action = sys.intern(action)
+        if action is _CONSIDER_LONG:
+            return _BUY
+        if action is _CONSIDER_SHORT:
+            return _SELL
+        return _HOLD
 
 
 def analyze_market_conditions(df: pd.DataFrame, symbol: str):
@@ -225,24 +341,32 @@ def analyze_market_conditions(df: pd.DataFrame, symbol: str):
     print(f"\n📊 ANÁLISIS DE CONDICIONES - {symbol}")
     print("="*50)
     
+    # Una sola extracción a ndarray: todas las métricas siguientes son
+    # aritmética sobre el mismo vector de cierres.
+    closes = df['Close'].to_numpy(copy=False)
+    last = closes[-1]
+
     # Estadísticas básicas
-    price_change = ((df['Close'].iloc[-1] / df['Close'].iloc[0]) - 1) * 100
-    volatility = df['Close'].pct_change().std() * 100
-    
-    print(f"   Precio inicial: ${df['Close'].iloc[0]:.6f}")
-    print(f"   Precio final: ${df['Close'].iloc[-1]:.6f}")
+    price_change = ((last / closes[0]) - 1) * 100
+    # pct_change sin pasar por pandas: diff entre consecutivos / anterior
+    returns = np.diff(closes) / closes[:-1]
+    volatility = returns.std() * 100
+
+    print(f"   Precio inicial: ${closes[0]:.6f}")
+    print(f"   Precio final: ${last:.6f}")
     print(f"   Cambio total: {price_change:+.2f}%")
     print(f"   Volatilidad: {volatility:.2f}%")
-    
-    # Análisis de tendencia por períodos
-    periods = [30, 60, 120, 240]
+
+    # Análisis de tendencia por períodos: los cuatro cambios porcentuales
+    # se calculan de una vez con indexación vectorizada.
+    periods = np.array([30, 60, 120, 240])
+    valid = periods <= closes.size
+    period_changes = (last / closes[-periods[valid]] - 1) * 100
     print(f"\n   📈 Tendencias por período:")
-    
-    for period in periods:
-        if len(df) >= period:
-            period_change = ((df['Close'].iloc[-1] / df['Close'].iloc[-period]) - 1) * 100
-            trend_label = "📈 ALCISTA" if period_change > 5 else "📉 BAJISTA" if period_change < -5 else "⚪ LATERAL"
-            print(f"      {period:3d} velas: {period_change:+6.2f}% {trend_label}")
+
+    for period, period_change in zip(periods[valid], period_changes):
+        trend_label = "📈 ALCISTA" if period_change > 5 else "📉 BAJISTA" if period_change < -5 else "⚪ LATERAL"
+        print(f"      {period:3d} velas: {period_change:+6.2f}% {trend_label}")
     
     # Clasificación del mercado
     if price_change > 20:
@@ -315,39 +439,59 @@ def test_multiple_assets():
     # Lista de activos a probar
     test_assets = ["ADAUSDT", "DOTUSDT", "AVAXUSDT", "SOLUSDT", "LINKUSDT"]
     START_DATE = "01 Oct, 2024"
-    
+
     bearish_candidates = []
-    
+
+    # Descarga concurrente: cada petición de klines es latencia de red pura
+    # (el GIL se libera durante las lecturas de socket), así que lanzar
+    # todos los símbolos a la vez acerca el wall clock al del más lento en
+    # lugar de a la suma de todos.
+    fetched = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(test_assets)) as executor:
+        futures = {
+            executor.submit(get_extended_historical_klines, symbol, "1h", START_DATE): symbol
+            for symbol in test_assets
+        }
+        for future in concurrent.futures.as_completed(futures):
+            symbol = futures[future]
+            try:
+                fetched[symbol] = future.result()
+            except Exception as e:
+                fetched[symbol] = e
+
+    # Análisis y clasificación en orden determinista una vez recogidos
+    # todos los datos (los prints no se entremezclan entre símbolos)
     for symbol in test_assets:
-        try:
-            print(f"\n🧪 Probando {symbol}...")
-            
-            # Cargar datos
-            df = get_extended_historical_klines(symbol, "1h", START_DATE)
-            
-            if df.empty:
-                print(f"   ❌ Sin datos para {symbol}")
-                continue
-            
-            # Analizar condiciones
-            market_type = analyze_market_conditions(df, symbol)
-            
-            # Determinar si es candidato bajista
-            price_change = ((df['Close'].iloc[-1] / df['Close'].iloc[0]) - 1) * 100
-            
-            if price_change < -5:  # Al menos -5% en el período
-                bearish_candidates.append({
-                    "symbol": symbol,
-                    "change": price_change,
-                    "market_type": market_type,
-                    "data": df
-                })
-                print(f"   ✅ CANDIDATO BAJISTA: {price_change:+.2f}%")
-            else:
-                print(f"   ⚪ No bajista: {price_change:+.2f}%")
-                
-        except Exception as e:
-            print(f"   ❌ Error con {symbol}: {e}")
+        result = fetched.get(symbol)
+        print(f"\n🧪 Probando {symbol}...")
+
+        if isinstance(result, Exception):
+            print(f"   ❌ Error con {symbol}: {result}")
+            continue
+
+        df = result
+        if df is None or df.empty:
+            print(f"   ❌ Sin datos para {symbol}")
+            continue
+
+        # Analizar condiciones
+        market_type = analyze_market_conditions(df, symbol)
+
+        # Determinar si es candidato bajista (lecturas escalares sobre el
+        # ndarray crudo, sin pasar por el indexador posicional de pandas)
+        closes = df['Close'].to_numpy(copy=False)
+        price_change = ((closes[-1] / closes[0]) - 1) * 100
+
+        if price_change < -5:  # Al menos -5% en el período
+            bearish_candidates.append({
+                "symbol": symbol,
+                "change": price_change,
+                "market_type": market_type,
+                "data": df
+            })
+            print(f"   ✅ CANDIDATO BAJISTA: {price_change:+.2f}%")
+        else:
+            print(f"   ⚪ No bajista: {price_change:+.2f}%")
     
     # Seleccionar el mejor candidato bajista
     if bearish_candidates:
@@ -367,6 +511,171 @@ def test_multiple_assets():
         return None
 
 
+def _execute_bearish_backtest(symbol, historical_df, initial_capital, verbose=True):
+    """
+    Configura la estrategia robusta y ejecuta el backtest completo sobre
+    un DataFrame ya indexado por Close_time. Devuelve el trade_history.
+
+    Separado de run_bearish_test para poder ejecutarlo también dentro de
+    los workers del test paralelo multi-símbolo.
+    """
+    indicator_manager = IndicatorManager()
+
+    elliott_strategy = ElliottWaveStrategyRobust(
+        min_wave_confidence=0.6,  # Balanceado
+        scalping_mode=True,
+        wave_analysis_lookback=80,
+        trend_filter_enabled=True,
+        trend_lookback=50,
+        adaptive_direction=True  # CRÍTICO para adaptación
+    )
+
+    risk_assessor = RiskAssessor(atr_multiplier_sl=2.0)
+
+    portfolio_manager = PortfolioManager(
+        initial_capital=initial_capital,
+        risk_per_trade_pct=0.015,  # Conservador para mercado bajista
+        indicator_manager=indicator_manager,
+        strategy=elliott_strategy,
+        risk_assessor=risk_assessor,
+        max_open_positions=1,
+        verbose=verbose
+    )
+
+    performance_analyzer = PerformanceAnalyzer()
+    backtester = Backtester(portfolio_manager, performance_analyzer)
+
+    backtester.run(
+        historical_data={symbol: historical_df},
+        initial_capital=initial_capital,
+        min_data_points=100
+    )
+
+    return portfolio_manager.trade_history
+
+
+# Columnas publicadas en memoria compartida para el test paralelo
+_SHARED_COLS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def _share_backtest_arrays(df):
+    """
+    Copia las columnas del backtest a bloques de SharedMemory.
+
+    Devuelve (bloques, nombres, n): los bloques quedan vivos en el padre
+    hasta después del Pool; los workers se adjuntan por nombre y leen los
+    arrays sin volver a serializar el DataFrame completo por pickle.
+    """
+    n = len(df)
+    shms = []
+    names = {}
+
+    for col in _SHARED_COLS:
+        arr = df[col].to_numpy(dtype=np.float64)
+        shm = shared_memory.SharedMemory(create=True, size=arr.nbytes)
+        np.ndarray(n, dtype=np.float64, buffer=shm.buf)[:] = arr
+        shms.append(shm)
+        names[col] = shm.name
+
+    # Close_time viaja como int64 (nanosegundos) y se reconstruye como
+    # DatetimeIndex en el worker.
+    ts = df['Close_time'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    shm = shared_memory.SharedMemory(create=True, size=ts.nbytes)
+    np.ndarray(n, dtype=np.int64, buffer=shm.buf)[:] = ts
+    shms.append(shm)
+    names['Close_time'] = shm.name
+
+    return shms, names, n
+
+
+def _bearish_backtest_worker(args):
+    """
+    Worker del Pool: reconstruye vistas ndarray sobre los bloques
+    compartidos (sin copia), arma el DataFrame y ejecuta el backtest
+    bajista de su símbolo. Devuelve un resumen pequeño y picklable.
+    """
+    symbol, names, n, initial_capital = args
+    opened = []
+    try:
+        data = {}
+        for col in _SHARED_COLS:
+            shm = shared_memory.SharedMemory(name=names[col])
+            opened.append(shm)
+            data[col] = np.ndarray(n, dtype=np.float64, buffer=shm.buf)
+
+        shm = shared_memory.SharedMemory(name=names['Close_time'])
+        opened.append(shm)
+        index = pd.DatetimeIndex(
+            np.ndarray(n, dtype=np.int64, buffer=shm.buf).view('datetime64[ns]')
+        )
+
+        historical_df = pd.DataFrame(data, index=index, copy=False)
+        historical_df.index.name = 'Close_time'
+        historical_df['SYMBOL'] = symbol
+
+        trade_history = _execute_bearish_backtest(
+            symbol, historical_df, initial_capital, verbose=False
+        )
+
+        # trade_history contiene TradeRecord (namedtuples)
+        total = len(trade_history)
+        pnl = float(sum(t.pnl for t in trade_history))
+        wins = sum(1 for t in trade_history if t.pnl > 0)
+        return {
+            'symbol': symbol,
+            'trades': total,
+            'pnl': pnl,
+            'win_rate': (wins / total) * 100 if total else 0.0,
+        }
+    finally:
+        for shm in opened:
+            shm.close()
+
+
+def run_bearish_tests_parallel(symbols, processes=None, initial_capital=10000.0):
+    """
+    Ejecuta el backtest bajista de varios símbolos en paralelo.
+
+    El eje símbolo es trivialmente paralelo (cada backtest es
+    independiente): los datos se descargan una vez en el proceso padre,
+    se publican en SharedMemory y un Pool de procesos reparte los
+    backtests, con casi-linealidad hasta min(símbolos, cores).
+    """
+    START_DATE = "01 Oct, 2024"
+
+    jobs = []
+    all_shms = []
+    for symbol in symbols:
+        df = get_extended_historical_klines(symbol, "1h", START_DATE)
+        if df is None or df.empty:
+            print(f"   ❌ Sin datos para {symbol}")
+            continue
+        shms, names, n = _share_backtest_arrays(df)
+        all_shms.extend(shms)
+        jobs.append((symbol, names, n, initial_capital))
+
+    if not jobs:
+        print("⚠️  Sin datos para el test paralelo")
+        return []
+
+    processes = processes or min(len(jobs), os.cpu_count() or 1)
+    print(f"\n🚀 Ejecutando {len(jobs)} backtests bajistas en {processes} procesos...")
+    try:
+        with multiprocessing.Pool(processes=processes) as pool:
+            results = pool.map(_bearish_backtest_worker, jobs)
+    finally:
+        # El padre es el dueño de los bloques: liberar siempre
+        for shm in all_shms:
+            shm.close()
+            shm.unlink()
+
+    print(f"\n📊 RESUMEN PARALELO:")
+    for res in results:
+        print(f"   {res['symbol']}: {res['trades']} trades | "
+              f"{res['win_rate']:.1f}% WR | ${res['pnl']:,.2f}")
+    return results
+
+
 def run_bearish_test(symbol=None):
     """
     Ejecuta el test en activo bajista.
@@ -400,7 +709,8 @@ def run_bearish_test(symbol=None):
     historical_df['SYMBOL'] = symbol
     historical_df.set_index('Close_time', inplace=True)
     
-    price_change = ((historical_df['Close'].iloc[-1] / historical_df['Close'].iloc[0]) - 1) * 100
+    closes = historical_df['Close'].to_numpy(copy=False)
+    price_change = ((closes[-1] / closes[0]) - 1) * 100
     
     print(f"\n📊 CONFIGURACIÓN DEL TEST:")
     print(f"   Activo: {symbol}")
@@ -413,62 +723,29 @@ def run_bearish_test(symbol=None):
     
     # Configurar estrategia robusta
     print("🔧 Configurando estrategia robusta...")
-    
-    indicator_manager = IndicatorManager()
-    
-    elliott_strategy = ElliottWaveStrategyRobust(
-        min_wave_confidence=0.6,  # Balanceado
-        scalping_mode=True,
-        wave_analysis_lookback=80,
-        trend_filter_enabled=True,
-        trend_lookback=50,
-        adaptive_direction=True  # CRÍTICO para adaptación
-    )
-    
-    risk_assessor = RiskAssessor(atr_multiplier_sl=2.0)
-    
-    portfolio_manager = PortfolioManager(
-        initial_capital=INITIAL_CAPITAL,
-        risk_per_trade_pct=0.015,  # Conservador para mercado bajista
-        indicator_manager=indicator_manager,
-        strategy=elliott_strategy,
-        risk_assessor=risk_assessor,
-        max_open_positions=1,
-        verbose=True
-    )
-    
     print("✅ Estrategia robusta configurada para mercado bajista")
-    
+
     # Ejecutar backtest
     print(f"\n🚀 Ejecutando test bajista...")
-    
+
     try:
-        performance_analyzer = PerformanceAnalyzer()
-        backtester = Backtester(portfolio_manager, performance_analyzer)
-        
         start_time = datetime.now()
-        backtester.run(
-            historical_data={symbol: historical_df},
-            initial_capital=INITIAL_CAPITAL,
-            min_data_points=100
-        )
+        trade_history = _execute_bearish_backtest(symbol, historical_df, INITIAL_CAPITAL)
         end_time = datetime.now()
-        
+
         print(f"⏱️  Test bajista completado en {(end_time-start_time).total_seconds():.2f}s")
-        
+
     except Exception as e:
         print(f"❌ ERROR en test bajista: {e}")
         import traceback
         traceback.print_exc()
         return
-    
+
     # Analizar resultados
     print(f"\n" + "="*60)
     print(f"📊 RESULTADOS TEST BAJISTA - {symbol}")
     print(f"="*60)
-    
-    trade_history = portfolio_manager.trade_history
-    
+
     if not trade_history:
         print("⚠️  Sin trades en mercado bajista")
         print("🔍 Posibles causas:")
@@ -477,13 +754,19 @@ def run_bearish_test(symbol=None):
         print("   - Validaciones muy estrictas")
         return
     
-    # Análisis de resultados bajistas
-    trades_df = pd.DataFrame(trade_history)
-    total_trades = len(trades_df)
-    total_pnl = trades_df['pnl'].sum()
+    # Análisis de resultados bajistas: agregados directos con NumPy, sin
+    # construir un DataFrame intermedio ni asignar un frame nuevo por cada
+    # filtro booleano — solo dos arrays y máscaras sobre ellos. El
+    # trade_history contiene TradeRecord (namedtuples): acceso por atributo.
+    total_trades = len(trade_history)
+    pnl = np.fromiter(
+        (t.pnl for t in trade_history), dtype=np.float64, count=total_trades
+    )
+    total_pnl = pnl.sum()
     final_capital = INITIAL_CAPITAL + total_pnl
     total_return = ((final_capital / INITIAL_CAPITAL) - 1) * 100
-    win_rate = (len(trades_df[trades_df['pnl'] > 0]) / total_trades) * 100
+    wins = pnl > 0
+    win_rate = wins.mean() * 100
     
     print(f"🐻 RESULTADOS EN MERCADO BAJISTA:")
     print(f"   Total trades: {total_trades}")
@@ -493,32 +776,41 @@ def run_bearish_test(symbol=None):
     print(f"   Capital final: ${final_capital:,.2f}")
     
     # Análisis direccional en mercado bajista
-    if 'direction' in trades_df.columns:
+    n_long = n_short = 0
+    if 'direction' in TradeRecord._fields:
         print(f"\n📊 ANÁLISIS DIRECCIONAL EN BAJISTA:")
-        
-        long_trades = trades_df[trades_df['direction'] == 'LONG']
-        short_trades = trades_df[trades_df['direction'] == 'SHORT']
-        
-        if not long_trades.empty:
-            long_pnl = long_trades['pnl'].sum()
-            long_wr = (len(long_trades[long_trades['pnl'] > 0]) / len(long_trades)) * 100
-            print(f"   🟢 LONG: {len(long_trades)} trades | {long_wr:.1f}% WR | ${long_pnl:,.2f}")
-        
-        if not short_trades.empty:
-            short_pnl = short_trades['pnl'].sum()
-            short_wr = (len(short_trades[short_trades['pnl'] > 0]) / len(short_trades)) * 100
-            print(f"   🔴 SHORT: {len(short_trades)} trades | {short_wr:.1f}% WR | ${short_pnl:,.2f}")
-            
+
+        # direction llega como int8 (1=LONG, -1=SHORT) desde el
+        # PortfolioManager; las máscaras operan sobre el entero crudo sin
+        # pasar por etiquetas de texto.
+        direction = np.fromiter(
+            (t.direction for t in trade_history), dtype=np.int8, count=total_trades
+        )
+        long_mask = direction == 1
+        short_mask = direction == -1
+        n_long = int(long_mask.sum())
+        n_short = int(short_mask.sum())
+
+        if n_long:
+            long_pnl = pnl[long_mask].sum()
+            long_wr = wins[long_mask].mean() * 100
+            print(f"   🟢 LONG: {n_long} trades | {long_wr:.1f}% WR | ${long_pnl:,.2f}")
+
+        if n_short:
+            short_pnl = pnl[short_mask].sum()
+            short_wr = wins[short_mask].mean() * 100
+            print(f"   🔴 SHORT: {n_short} trades | {short_wr:.1f}% WR | ${short_pnl:,.2f}")
+
         # Validar adaptación
-        if len(short_trades) > len(long_trades):
+        if n_short > n_long:
             print(f"   ✅ ADAPTACIÓN CORRECTA: Más SHORT en mercado bajista")
         else:
             print(f"   ⚠️  ADAPTACIÓN CUESTIONABLE: Más LONG en mercado bajista")
-    
+
     # Comparación con DOGE (mercado alcista)
     print(f"\n🔄 COMPARACIÓN ALCISTA vs BAJISTA:")
     print(f"   DOGE (Alcista +53%): +95.58% | 63.3% WR | 60% LONG")
-    print(f"   {symbol} (Bajista {price_change:+.1f}%): {total_return:+.2f}% | {win_rate:.1f}% WR | {len(short_trades)/total_trades*100:.0f}% SHORT")
+    print(f"   {symbol} (Bajista {price_change:+.1f}%): {total_return:+.2f}% | {win_rate:.1f}% WR | {n_short/total_trades*100:.0f}% SHORT")
     
     # Evaluación de robustez
     print(f"\n🎯 EVALUACIÓN DE ROBUSTEZ:")
@@ -535,7 +827,7 @@ def run_bearish_test(symbol=None):
     
     print(f"   📊 ROBUSTEZ DE LA ESTRATEGIA: {robustez}")
     
-    if len(short_trades) > len(long_trades) and total_return > -30:
+    if n_short > n_long and total_return > -30:
         print(f"   ✅ ESTRATEGIA SE ADAPTA CORRECTAMENTE A DIFERENTES MERCADOS")
     else:
         print(f"   🔧 ESTRATEGIA NECESITA AJUSTES PARA MERCADOS BAJISTAS")